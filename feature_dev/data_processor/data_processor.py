@@ -39,12 +39,30 @@ event_count = 0
 source_count = 0
 entity_count = 0
 
+# (filename, claim id, field, missing ref id) for refs that point at nothing in their file
+dangling_refs = []
+
+
+def resolve_refs(claim, field, index, filename):
+    """Map a claim's list of local ref ids to uids, leaving and recording any dangling ones."""
+    resolved = []
+    for ref_id in claim[field]:
+        ref = index.get(ref_id)
+        if ref is None:
+            dangling_refs.append((filename, claim["id"], field, ref_id))
+            resolved.append(ref_id)
+        else:
+            resolved.append(ref["uid"])
+    return resolved
+
+
 for file in data_files:
     try:
         with open(file, "r") as f:
             data_json = json.load(f)
     except Exception as e:
         print(e)
+        continue
 
     # Metadata to attach to any elements grabbed from media
     link = data_json["link"]
@@ -105,45 +123,35 @@ for file in data_files:
         #claims_text.append(train_text)
 
     # run to correct ref pointers
-    # Going to assume json won't always list elements in order of their ids
-    for claim in data_json["claims"]:
-        #print(f"\n\n\n{claim}\n")
-        for entity in data_json["entities"]:
-            if entity["id"] == claim["speaker"]:
-                claim["speaker"] = entity["uid"]
-                claim["train_text"] = claim["train_text"] + f": {entity["name"]}"
-                claims_text.append(claim["train_text"])
-                break
-        
-        for i in range(len(claim["sources"])):
-            source_id = claim["sources"][i]
-            for source in data_json["sources"]:
-                if source["id"] == source_id:
-                    claim["sources"][i] = source["uid"]
-                    break
+    # Going to assume json won't always list elements in order of their ids,
+    # so build local id -> element lookups once per file instead of rescanning
+    entities_by_id = {entity["id"]: entity for entity in data_json["entities"]}
+    sources_by_id = {source["id"]: source for source in data_json["sources"]}
+    events_by_id = {event["id"]: event for event in data_json["events"]}
+    claims_by_id = {claim["id"]: claim for claim in data_json["claims"]}
 
-        for i in range(len(claim["events"])):
-            event_id = claim["events"][i]
-            for event in data_json["events"]:
-                if event["id"] == event_id:
-                    claim["events"][i] = event["uid"]
-                    break
+    for claim in data_json["claims"]:
+        speaker = entities_by_id.get(claim["speaker"])
+        if speaker is not None:
+            claim["speaker"] = speaker["uid"]
+            claim["train_text"] = claim["train_text"] + f": {speaker['name']}"
+        else:
+            dangling_refs.append((filename, claim["id"], "speaker", claim["speaker"]))
+        claims_text.append(claim["train_text"])
 
-        #print(f"{claim['counter_arguments']} size: {len(claim['counter_arguments'])}")
-        for i in range(len(claim["counter_arguments"])):
-            #print(f"\tcounterargs - {i}:")
-            counter_argument_id = claim["counter_arguments"][i]
-            for counter_claim in data_json["claims"]:
-                if counter_claim["id"] == counter_argument_id:
-                    claim["counter_arguments"][i] = counter_claim["uid"]
-                    break
-        
-        #print(f"\n{claim}\n")
+        claim["sources"] = resolve_refs(claim, "sources", sources_by_id, filename)
+        claim["events"] = resolve_refs(claim, "events", events_by_id, filename)
+        claim["counter_arguments"] = resolve_refs(claim, "counter_arguments", claims_by_id, filename)
 
     # Add updated claims to store of claims
     for claim in data_json["claims"]:
         claims.append(claim)
 
+if dangling_refs:
+    print(f"{len(dangling_refs)} dangling references left unresolved:")
+    for filename, claim_id, field, ref_id in dangling_refs:
+        print(f"\t- {filename}: {claim_id}.{field} -> {ref_id}")
+
 
 # Output results in separate json files
 with open("./outputs/claims.json", "w+") as f:
@@ -0,0 +1,94 @@
+"""
+Cross-article canonical claim merging.
+
+Canonical claim ids are hashes of the LLM's canonical text, so the same claim worded
+slightly differently in two articles gets two ids. This merges canonical claims whose
+embeddings are within a tight cosine distance into one, and remaps the claims that
+pointed at the merged ids.
+"""
+
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+
+from clustering import threshold_labels
+from config.settings import get_settings
+
+CLAIM_LISTS = ("supporting_claims", "refuting_claims", "uncertain_claims")
+
+
+def _support_count(cc: dict) -> int:
+    return sum(len(cc.get(name) or []) for name in CLAIM_LISTS)
+
+
+class CanonicalMerger:
+    """Merges near-duplicate canonical claims in DataGrabber.extract_data_from_fjson output."""
+
+    def __init__(self, vector_store=None, dist_thresh: Optional[float] = None):
+        """
+        Args:
+            vector_store: Used for its batched, cached get_embeddings (default: get_vector_store()).
+            dist_thresh: Cosine distance under which two canonical claims are the same claim
+                (default: settings.cluster.canonical_dist_thresh). Keep it tight, a claim and
+                its negation embed close together.
+        """
+        if vector_store is None:
+            from database.backends import get_vector_store
+            vector_store = get_vector_store()
+        self.vector_store = vector_store
+        self.dist_thresh = dist_thresh or get_settings().cluster.canonical_dist_thresh
+        # Merged canonical id -> id of the canonical claim it was merged into
+        self.id_map: Dict[str, str] = {}
+
+    def merge(self, data: dict) -> dict:
+        """
+        Merge near-duplicate canonical claims, in place.
+
+        The canonical claim with the most linked claims in each group is kept (its text
+        and id survive), the others' supporting/refuting/uncertain lists are folded into
+        it, and every claim's canonical_id is remapped. Merged ids are listed on the
+        kept claim under "merged_ids".
+
+        Args:
+            data: Result of DataGrabber.extract_data_from_fjson.
+
+        Returns:
+            The same dict, with fewer canonical claims.
+        """
+        canonical = data["canonical_claims"]
+        if len(canonical) < 2:
+            return data
+
+        # Best supported first, so it leads (and names) its group
+        ccs = sorted(canonical.values(), key=lambda cc: (-_support_count(cc), cc["text"]))
+        embeddings = np.asarray(
+            self.vector_store.get_embeddings([cc["text"] for cc in ccs]), dtype=np.float32
+        )
+        labels = threshold_labels(embeddings, dist_thresh=self.dist_thresh)
+
+        kept: Dict[int, dict] = {}
+        for cc, label in zip(ccs, labels):
+            leader = kept.setdefault(label, cc)
+            if leader is cc:
+                continue
+            for name in CLAIM_LISTS:
+                merged = leader.get(name) or []
+                leader[name] = list(dict.fromkeys(merged + (cc.get(name) or [])))
+            leader.setdefault("merged_ids", []).append(cc["id"])
+            self.id_map[cc["id"]] = leader["id"]
+
+        data["canonical_claims"] = {cc["id"]: cc for cc in kept.values()}
+        for claim in data["claims"].values():
+            claim["canonical_id"] = self.id_map.get(claim.get("canonical_id"), claim.get("canonical_id", ""))
+
+        logging.info(
+            f"Merged {len(canonical)} canonical claims into {len(kept)} "
+            f"(cosine distance <= {self.dist_thresh})"
+        )
+        return data
+
+
+def merge_canonical_claims(data: dict, vector_store=None, dist_thresh: Optional[float] = None) -> dict:
+    """Shorthand for CanonicalMerger(vector_store, dist_thresh).merge(data)."""
+    return CanonicalMerger(vector_store, dist_thresh).merge(data)
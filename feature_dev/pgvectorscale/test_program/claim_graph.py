@@ -0,0 +1,362 @@
+"""
+Compact traversal graph over canonical claims, claims, entities, sources and events.
+
+The graph is a CSR adjacency (indptr / indices / edge type arrays) with both edge
+directions stored, and node ids kept sorted so an id is found by binary search. All
+arrays are saved as .npy files and loaded with mmap, so opening a saved graph is
+instant and memory is shared between processes.
+
+    k_hop()          nodes within k edges of a node
+    stance()         who supports / refutes / is uncertain about a canonical claim
+    shortest_path()  fewest-edges path between two nodes
+"""
+
+import logging
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Node kinds
+NODE_KINDS = ["canonical_claim", "claim", "entity", "source", "event"]
+
+# Edge types, every edge is stored in both directions with the same type
+SUPPORTS, REFUTES, UNCERTAIN, CANONICAL, SPOKE, CITES, ABOUT = range(7)
+EDGE_TYPES = {
+    "supports": SUPPORTS,      # claim - canonical claim it supports
+    "refutes": REFUTES,        # claim - canonical claim it refutes
+    "uncertain": UNCERTAIN,    # claim - canonical claim it is uncertain about
+    "canonical": CANONICAL,    # claim - its canonical_id
+    "spoke": SPOKE,            # claim - speaker entity
+    "cites": CITES,            # claim - source
+    "about": ABOUT,            # claim - event
+}
+STANCES = {"supporting": SUPPORTS, "refuting": REFUTES, "uncertain": UNCERTAIN}
+
+GRAPH_FILES = ("node_ids", "node_kinds", "indptr", "indices", "edge_types")
+
+
+class ClaimGraph:
+    """Read-only CSR graph, build with from_store / from_db, persist with save / load."""
+
+    def __init__(
+        self,
+        node_ids: np.ndarray,
+        node_kinds: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        edge_types: np.ndarray,
+    ):
+        self.node_ids = node_ids
+        self.node_kinds = node_kinds
+        self.indptr = indptr
+        self.indices = indices
+        self.edge_types = edge_types
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices) // 2
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(
+        cls,
+        nodes: Dict[str, Iterable[str]],
+        edges: Iterable[Tuple[str, str, int]],
+    ) -> "ClaimGraph":
+        """
+        Build the CSR arrays.
+
+        Args:
+            nodes: Node ids per kind (keys from NODE_KINDS).
+            edges: (id, id, edge type) triples, edges to unknown ids are dropped.
+        """
+        start_time = time.time()
+        ids, kinds = [], []
+        for kind, kind_ids in nodes.items():
+            kind_ids = [id_ for id_ in dict.fromkeys(kind_ids) if id_]
+            ids.extend(kind_ids)
+            kinds.extend([NODE_KINDS.index(kind)] * len(kind_ids))
+        # Fixed-width UTF-8 bytes, sized by the longest encoded id
+        encoded = [id_.encode("utf-8") for id_ in ids]
+        width = max((len(id_) for id_ in encoded), default=1)
+        node_ids = np.array(encoded, dtype=f"S{width}")
+        order = np.argsort(node_ids, kind="stable")
+        node_ids = node_ids[order]
+        node_kinds = np.array(kinds, dtype=np.int8)[order]
+        # Ids shared between kinds keep their first kind
+        node_ids, first = np.unique(node_ids, return_index=True)
+        node_kinds = node_kinds[first]
+
+        graph = cls(node_ids, node_kinds, np.zeros(len(node_ids) + 1, dtype=np.int64),
+                    np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int8))
+        src, dst, types = [], [], []
+        for a, b, edge_type in edges:
+            src.append(a)
+            dst.append(b)
+            types.append(edge_type)
+        src_rows = graph._rows(src)
+        dst_rows = graph._rows(dst)
+        types = np.array(types, dtype=np.int8)
+        keep = (src_rows >= 0) & (dst_rows >= 0)
+        logging.info(f"Dropped {int((~keep).sum())} edges to unknown nodes")
+        src_rows, dst_rows, types = src_rows[keep], dst_rows[keep], types[keep]
+
+        # Both directions, deduplicated, sorted by source row
+        rows = np.concatenate([src_rows, dst_rows])
+        cols = np.concatenate([dst_rows, src_rows])
+        types = np.concatenate([types, types])
+        packed = np.unique(np.stack([rows, cols, types.astype(np.int64)]), axis=1)
+        rows, cols, types = packed[0], packed[1], packed[2]
+
+        graph.indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(node_ids)))]).astype(np.int64)
+        graph.indices = cols.astype(np.int32)
+        graph.edge_types = types.astype(np.int8)
+        logging.info(
+            f"Built claim graph: {len(graph)} nodes, {graph.num_edges} edges in {time.time() - start_time:.3f} seconds"
+        )
+        return graph
+
+    @classmethod
+    def from_store(cls, store) -> "ClaimGraph":
+        """Build from a records.ClaimStore (DataGrabber.extract_records)."""
+        claims = store["claims"]
+        canonical = store["canonical_claims"]
+        nodes = {
+            "canonical_claim": (cc.id for cc in canonical),
+            "claim": (c.id for c in claims),
+            "entity": (e.id for e in store["entities"]),
+            "source": (s.id for s in store["sources"]),
+            "event": (e.id for e in store["events"]),
+        }
+
+        def edges():
+            for cc in canonical:
+                for stance, edge_type in STANCES.items():
+                    for claim_id in getattr(cc, f"{stance}_claims"):
+                        yield claim_id, cc.id, edge_type
+            for c in claims:
+                yield c.id, c.canonical_id, CANONICAL
+                yield c.id, c.speaker, SPOKE
+                for source in c.sources:
+                    yield c.id, source, CITES
+                for event in c.events:
+                    yield c.id, event, ABOUT
+
+        return cls.build(nodes, edges())
+
+    @classmethod
+    def from_db(cls) -> "ClaimGraph":
+        """Build from the KnowledgeGraph tables (know_graph_example.py) in Postgres."""
+        from database.connection import get_pool
+
+        with get_pool().connection() as conn:
+            nodes = {
+                kind: [id_ for (id_,) in conn.execute(f"SELECT id FROM {table}")]
+                for kind, table in (("canonical_claim", "canonical_claims"), ("claim", "claims"),
+                                    ("entity", "entities"), ("source", "sources"), ("event", "events"))
+            }
+            edges = [
+                (claim_id, canonical_id, STANCES[stance])
+                for canonical_id, claim_id, stance in conn.execute(
+                    "SELECT canonical_id, claim_id, stance FROM canonical_claim_links"
+                )
+            ]
+            for claim_id, canonical_id, speaker in conn.execute("SELECT id, canonical_id, speaker FROM claims"):
+                edges.append((claim_id, canonical_id, CANONICAL))
+                edges.append((claim_id, speaker, SPOKE))
+            edges.extend((c, s, CITES) for c, s in conn.execute("SELECT claim_id, source_id FROM claim_sources"))
+            edges.extend((c, e, ABOUT) for c, e in conn.execute("SELECT claim_id, event_id FROM claim_events"))
+        return cls.build(nodes, edges)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in GRAPH_FILES:
+            np.save(path / f"{name}.npy", getattr(self, name))
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> "ClaimGraph":
+        """Open a saved graph, memory-mapped unless mmap=False."""
+        path = Path(path)
+        mode = "r" if mmap else None
+        return cls(*(np.load(path / f"{name}.npy", mmap_mode=mode) for name in GRAPH_FILES))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _rows(self, ids: Sequence[Optional[str]]) -> np.ndarray:
+        """Row of each id, -1 for unknown ids."""
+        if len(ids) == 0 or len(self.node_ids) == 0:
+            return np.full(len(ids), -1, dtype=np.int64)
+        encoded = [(id_ or "").encode("utf-8") for id_ in ids]
+        # Casting to the node id width would truncate longer ids onto other nodes ("claim_12" -> "claim_1")
+        fits = np.array([len(key) <= self.node_ids.itemsize for key in encoded])
+        keys = np.array([key if ok else b"" for key, ok in zip(encoded, fits)], dtype=self.node_ids.dtype)
+        rows = np.searchsorted(self.node_ids, keys)
+        rows = np.minimum(rows, len(self.node_ids) - 1)
+        return np.where(fits & (self.node_ids[rows] == keys), rows, -1)
+
+    def _row(self, id_: str) -> int:
+        row = int(self._rows([id_])[0])
+        if row < 0:
+            raise KeyError(f"Unknown node: {id_}")
+        return row
+
+    def _id(self, row: int) -> str:
+        return self.node_ids[row].decode("utf-8")
+
+    def kind(self, id_: str) -> str:
+        return NODE_KINDS[self.node_kinds[self._row(id_)]]
+
+    def _expand(self, frontier: np.ndarray, edge_types: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """All (source row, neighbour row) edges out of the frontier rows, as two arrays."""
+        starts = self.indptr[frontier]
+        counts = self.indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        # Positions starts[i] .. starts[i] + counts[i] for every frontier row, without a Python loop
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+        sources = np.repeat(frontier, counts)
+        neighbours = self.indices[offsets].astype(np.int64)
+        if edge_types is not None:
+            keep = np.isin(self.edge_types[offsets], edge_types)
+            sources, neighbours = sources[keep], neighbours[keep]
+        return sources, neighbours
+
+    @staticmethod
+    def _edge_filter(edge_types: Optional[Iterable[str]]) -> Optional[np.ndarray]:
+        if edge_types is None:
+            return None
+        return np.array([EDGE_TYPES[name] for name in edge_types], dtype=np.int8)
+
+    def neighbors(self, id_: str, edge_types: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
+        """(neighbour id, edge type name) for each edge of a node."""
+        row = self._row(id_)
+        names = {value: name for name, value in EDGE_TYPES.items()}
+        allowed = self._edge_filter(edge_types)
+        result = []
+        for offset in range(self.indptr[row], self.indptr[row + 1]):
+            edge_type = int(self.edge_types[offset])
+            if allowed is None or edge_type in allowed:
+                result.append((self._id(self.indices[offset]), names[edge_type]))
+        return result
+
+    def k_hop(
+        self,
+        id_: str,
+        k: int = 2,
+        edge_types: Optional[Iterable[str]] = None,
+        kinds: Optional[Iterable[str]] = None,
+        max_nodes: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        Nodes within k edges of a node.
+
+        Args:
+            id_: Start node id.
+            k: Maximum number of hops.
+            edge_types: Only follow these edge types (names from EDGE_TYPES).
+            kinds: Only return nodes of these kinds (all kinds are still traversed).
+            max_nodes: Stop expanding once this many nodes have been reached.
+
+        Returns:
+            {node id: hop count}, the start node at 0.
+        """
+        allowed = self._edge_filter(edge_types)
+        hops = np.full(len(self.node_ids), -1, dtype=np.int16)
+        frontier = np.array([self._row(id_)], dtype=np.int64)
+        hops[frontier] = 0
+        reached = 1
+        for hop in range(1, k + 1):
+            _, neighbours = self._expand(frontier, allowed)
+            frontier = np.unique(neighbours[hops[neighbours] < 0])
+            if len(frontier) == 0:
+                break
+            hops[frontier] = hop
+            reached += len(frontier)
+            if max_nodes and reached >= max_nodes:
+                break
+
+        rows = np.flatnonzero(hops >= 0)
+        if kinds is not None:
+            kind_values = [NODE_KINDS.index(kind) for kind in kinds]
+            rows = rows[np.isin(self.node_kinds[rows], kind_values)]
+        return {self._id(row): int(hops[row]) for row in rows}
+
+    def stance(self, canonical_id: str) -> Dict[str, List[Dict[str, Optional[str]]]]:
+        """
+        Who supports, refutes or is uncertain about a canonical claim.
+
+        Returns:
+            {"supporting" | "refuting" | "uncertain": [{"claim": claim id, "speaker": entity id or None}]}
+        """
+        row = self._row(canonical_id)
+        result = {}
+        for stance, edge_type in STANCES.items():
+            _, claims = self._expand(np.array([row]), np.array([edge_type], dtype=np.int8))
+            entries = []
+            for claim in np.unique(claims):
+                _, speakers = self._expand(np.array([claim]), np.array([SPOKE], dtype=np.int8))
+                entries.append({
+                    "claim": self._id(claim),
+                    "speaker": self._id(speakers[0]) if len(speakers) else None,
+                })
+            result[stance] = entries
+        return result
+
+    def shortest_path(
+        self,
+        source_id: str,
+        target_id: str,
+        edge_types: Optional[Iterable[str]] = None,
+        max_hops: int = 8,
+    ) -> Optional[List[str]]:
+        """Fewest-edges path from source to target as a list of node ids, None if none within max_hops."""
+        allowed = self._edge_filter(edge_types)
+        source, target = self._row(source_id), self._row(target_id)
+        parent = np.full(len(self.node_ids), -1, dtype=np.int64)
+        parent[source] = source
+        frontier = np.array([source], dtype=np.int64)
+        for _ in range(max_hops):
+            if parent[target] >= 0:
+                break
+            sources, neighbours = self._expand(frontier, allowed)
+            new = parent[neighbours] < 0
+            sources, neighbours = sources[new], neighbours[new]
+            # First edge found wins for each newly reached node
+            neighbours, first = np.unique(neighbours, return_index=True)
+            parent[neighbours] = sources[first]
+            frontier = neighbours
+            if len(frontier) == 0:
+                break
+        if parent[target] < 0:
+            return None
+
+        path = deque([target])
+        while path[0] != source:
+            path.appendleft(int(parent[path[0]]))
+        return [self._id(row) for row in path]
+
+
+if __name__ == "__main__":
+    from grab_data import DataGrabber
+
+    graph = ClaimGraph.from_store(DataGrabber().extract_records())
+    graph.save("./outputs/claim_graph")
+    graph = ClaimGraph.load("./outputs/claim_graph")
+    print(f"{len(graph)} nodes, {graph.num_edges} edges")
@@ -0,0 +1,337 @@
+"""
+Claim clustering that never builds the full N x N distance matrix.
+
+    knn_graph()          each claim's k nearest neighbours (blocked exact search, or HNSW)
+    hdbscan_labels()     HDBSCAN over the sparse k-NN distance graph, O(N * k) memory
+    threshold_labels()   greedy distance-threshold clustering over blocked float32 distance rows
+    component_labels()   connected components of the within-threshold pair graph
+    ClusterState         centroids and sizes for assigning new claims incrementally
+"""
+
+import logging
+import time
+from typing import Optional, Tuple
+
+import hdbscan
+import hnswlib
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from database.exact_search import ExactSearcher, normalize_rows
+
+# Largest possible cosine distance, used to link otherwise disconnected graph components
+MAX_COSINE_DISTANCE = 2.0
+
+# Query x row scores per exact k-NN step (4M float32 = 16 MB, plus argpartition temporaries)
+EXACT_SCORE_BUDGET = 4 * 1024 * 1024
+
+
+def knn_graph(
+    embeddings: np.ndarray,
+    k: int = 15,
+    method: str = "exact",
+    block_size: int = 4096,
+    ef: int = 200,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find every row's k nearest other rows by cosine distance.
+
+    Args:
+        embeddings: (N, dim) embeddings, float32 avoids a copy.
+        k: Neighbours per row.
+        method: "exact" (blocked brute force, O(N^2) time, scores only EXACT_SCORE_BUDGET
+            query x row pairs at a time) or "hnsw" (in-memory approximate index, for large corpora).
+        block_size: Query rows searched at a time for "exact", the matrix is scored in
+            row blocks of EXACT_SCORE_BUDGET // block_size.
+        ef: HNSW build and search breadth for "hnsw".
+
+    Returns:
+        (neighbors, distances), each (N, k) sorted nearest first, without the row itself.
+        Padded with -1 / inf when there are fewer than k other rows.
+    """
+    embeddings = normalize_rows(embeddings)
+    n = len(embeddings)
+    search_k = min(k + 1, n)
+    start_time = time.time()
+
+    if method == "exact":
+        searcher = ExactSearcher(embeddings, block_size=max(1, EXACT_SCORE_BUDGET // block_size))
+        rows = np.empty((n, search_k), dtype=np.int64)
+        dists = np.empty((n, search_k), dtype=np.float32)
+        for start in range(0, n, block_size):
+            rows[start:start + block_size], dists[start:start + block_size] = searcher.search(
+                embeddings[start:start + block_size], search_k
+            )
+    elif method == "hnsw":
+        index = hnswlib.Index(space="cosine", dim=embeddings.shape[1])
+        index.init_index(max_elements=n, ef_construction=ef, M=16)
+        index.add_items(embeddings, np.arange(n))
+        index.set_ef(max(ef, search_k))
+        labels, dists = index.knn_query(embeddings, k=search_k)
+        rows = labels.astype(np.int64)
+    else:
+        raise ValueError(f"Unsupported k-NN method: {method}")
+
+    # Drop each row's own entry, or the farthest one when a duplicate displaced it
+    is_self = rows == np.arange(n)[:, None]
+    is_self[~is_self.any(axis=1), -1] = True
+    neighbors = rows[~is_self].reshape(n, search_k - 1)
+    distances = dists[~is_self].reshape(n, search_k - 1).astype(np.float32)
+    if search_k - 1 < k:
+        pad = k - (search_k - 1)
+        neighbors = np.pad(neighbors, ((0, 0), (0, pad)), constant_values=-1)
+        distances = np.pad(distances, ((0, 0), (0, pad)), constant_values=np.inf)
+
+    logging.info(f"Built {method} {k}-NN graph over {n} embeddings in {time.time() - start_time:.3f} seconds")
+    return neighbors, distances
+
+
+def knn_distance_matrix(neighbors: np.ndarray, distances: np.ndarray) -> sparse.csr_matrix:
+    """
+    Symmetric sparse distance matrix from a k-NN graph, for metric="precomputed" clusterers.
+
+    An edge is kept if either row lists the other as a neighbour. Disconnected components
+    are chained together with MAX_COSINE_DISTANCE edges, since HDBSCAN needs a connected graph.
+    """
+    n = len(neighbors)
+    valid = neighbors >= 0
+    rows = np.repeat(np.arange(n), neighbors.shape[1])[valid.ravel()]
+    cols = neighbors[valid]
+    # Explicit zeros (duplicate claims) would read as missing edges
+    dists = np.maximum(distances[valid], 1e-8)
+
+    rows, cols = np.concatenate([rows, cols]), np.concatenate([cols, rows])
+    dists = np.concatenate([dists, dists])
+    keys = rows * n + cols
+    order = np.lexsort((dists, keys))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = keys[order][1:] != keys[order][:-1]
+    order = order[first]
+    rows, cols, dists = rows[order], cols[order], dists[order]
+
+    num_components, component = connected_components(
+        sparse.csr_matrix((dists, (rows, cols)), shape=(n, n)), directed=False
+    )
+    if num_components > 1:
+        representatives = np.unique(component, return_index=True)[1]
+        links = np.stack([representatives[:-1], representatives[1:]])
+        rows = np.concatenate([rows, links[0], links[1]])
+        cols = np.concatenate([cols, links[1], links[0]])
+        dists = np.concatenate([dists, np.full(2 * links.shape[1], MAX_COSINE_DISTANCE, dtype=dists.dtype)])
+
+    return sparse.csr_matrix((dists, (rows, cols)), shape=(n, n))
+
+
+def hdbscan_labels(
+    embeddings: np.ndarray,
+    k: int = 15,
+    min_cluster_size: int = 2,
+    min_samples: int = 1,
+    method: str = "exact",
+) -> np.ndarray:
+    """
+    HDBSCAN cluster labels (-1 for noise) computed from the k-NN distance graph.
+
+    Args:
+        embeddings: (N, dim) embeddings.
+        k: Neighbours per claim kept in the graph, must be >= min_samples.
+        min_cluster_size, min_samples: HDBSCAN parameters.
+        method: k-NN search method, as for knn_graph.
+    """
+    if len(embeddings) < 2:
+        return np.full(len(embeddings), -1, dtype=np.int64)
+    neighbors, distances = knn_graph(embeddings, k=max(k, min_samples), method=method)
+    matrix = knn_distance_matrix(neighbors, distances)
+    clusterer = hdbscan.HDBSCAN(metric="precomputed", min_samples=min_samples, min_cluster_size=min_cluster_size)
+    return clusterer.fit_predict(matrix)
+
+
+def threshold_labels(
+    embeddings: np.ndarray,
+    dist_thresh: float = 0.35,
+    block_size: int = 1024,
+) -> np.ndarray:
+    """
+    Greedy threshold clustering: each unlabelled claim, in order, starts a new cluster
+    and claims every later unlabelled claim within dist_thresh (cosine distance).
+
+    Distance rows are computed block_size rows at a time in float32, against only the
+    rows from the block onwards (earlier rows are already labelled), and each cluster
+    leader assigns its members with one vectorized mask.
+    """
+    embeddings = normalize_rows(embeddings)
+    n = len(embeddings)
+    labels = np.full(n, -1, dtype=np.int64)
+    current_label = 0
+
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        block_dist = 1.0 - embeddings[start:stop] @ embeddings[start:].T
+        for i in range(start, stop):
+            if labels[i] != -1:
+                continue
+            # Row i's distances to rows i.. (everything before i is already labelled)
+            later = labels[i:] == -1
+            later &= block_dist[i - start, i - start:] <= dist_thresh
+            labels[i:][later] = current_label
+            labels[i] = current_label
+            current_label += 1
+
+    return labels
+
+
+def threshold_pairs(
+    embeddings: np.ndarray,
+    dist_thresh: float = 0.35,
+    block_size: int = 1024,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Every (i, j), i < j, pair within dist_thresh, from blocked float32 distance rows."""
+    embeddings = normalize_rows(embeddings)
+    n = len(embeddings)
+    left, right = [], []
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        block_dist = 1.0 - embeddings[start:stop] @ embeddings[start:].T
+        i, j = np.nonzero(block_dist <= dist_thresh)
+        i += start
+        j += start
+        keep = j > i
+        left.append(i[keep])
+        right.append(j[keep])
+    if not left:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(left), np.concatenate(right)
+
+
+def component_labels(
+    embeddings: np.ndarray,
+    dist_thresh: float = 0.35,
+    method: str = "exact",
+    k: int = 15,
+    block_size: int = 1024,
+) -> np.ndarray:
+    """
+    Connected-components threshold clustering (single linkage cut at dist_thresh).
+
+    Claims within dist_thresh of each other share a cluster, transitively, so unlike
+    threshold_labels the result doesn't depend on input order. Labels are numbered
+    by each cluster's first claim.
+
+    Args:
+        embeddings: (N, dim) embeddings.
+        dist_thresh: Cosine distance linking two claims.
+        method: "exact" (every pair, blocked) or "hnsw" (pairs among each claim's k
+            approximate nearest neighbours, a range query bounded by k).
+        k: Neighbours per claim for "hnsw".
+        block_size: Rows per distance block for "exact".
+    """
+    n = len(embeddings)
+    if method == "exact":
+        left, right = threshold_pairs(embeddings, dist_thresh, block_size)
+    else:
+        neighbors, distances = knn_graph(embeddings, k=k, method=method)
+        close = (neighbors >= 0) & (distances <= dist_thresh)
+        left = np.repeat(np.arange(n), neighbors.shape[1])[close.ravel()]
+        right = neighbors[close]
+
+    graph = sparse.csr_matrix((np.ones(len(left), dtype=np.int8), (left, right)), shape=(n, n))
+    _, component = connected_components(graph, directed=False)
+    # Renumber so clusters are labelled in order of their first claim
+    _, first, inverse = np.unique(component, return_index=True, return_inverse=True)
+    return np.argsort(np.argsort(first))[inverse].astype(np.int64)
+
+
+class ClusterState:
+    """
+    Cluster summaries used to place new claims without re-clustering the corpus.
+
+    Each cluster keeps the sum of its members' unit-length embeddings (the direction
+    of its centroid) and its size, kept sorted by cluster id.
+    """
+
+    def __init__(
+        self,
+        cluster_ids: Optional[np.ndarray] = None,
+        sums: Optional[np.ndarray] = None,
+        sizes: Optional[np.ndarray] = None,
+        dim: Optional[int] = None,
+    ):
+        if cluster_ids is None:
+            cluster_ids, sums, sizes = [], np.empty((0, dim or 0)), []
+        order = np.argsort(np.asarray(cluster_ids, dtype=np.int64))
+        self.cluster_ids = np.asarray(cluster_ids, dtype=np.int64)[order]
+        self.sums = np.asarray(sums, dtype=np.float32)[order]
+        self.sizes = np.asarray(sizes, dtype=np.int64)[order]
+
+    @classmethod
+    def from_labels(cls, embeddings: np.ndarray, labels: np.ndarray) -> "ClusterState":
+        """Summarize a full clustering run, noise (-1) labels are left out."""
+        embeddings = normalize_rows(embeddings)
+        labels = np.asarray(labels, dtype=np.int64)
+        keep = labels >= 0
+        cluster_ids, inverse = np.unique(labels[keep], return_inverse=True)
+        sums = np.zeros((len(cluster_ids), embeddings.shape[1]), dtype=np.float32)
+        np.add.at(sums, inverse, embeddings[keep])
+        return cls(cluster_ids, sums, np.bincount(inverse, minlength=len(cluster_ids)))
+
+    def __len__(self) -> int:
+        return len(self.cluster_ids)
+
+    @property
+    def next_id(self) -> int:
+        return int(self.cluster_ids[-1]) + 1 if len(self.cluster_ids) else 0
+
+    @property
+    def centroids(self) -> np.ndarray:
+        return normalize_rows(self.sums)
+
+    def assign(
+        self,
+        embeddings: np.ndarray,
+        dist_thresh: float = 0.35,
+        block_size: int = 1024,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Assign new claims to the nearest cluster centroid within dist_thresh.
+
+        Claims with no centroid in range are clustered among themselves (greedy threshold)
+        into new clusters. Centroids and sizes are updated in place.
+
+        Args:
+            embeddings: (M, dim) embeddings of the new claims.
+            dist_thresh: Cosine distance to a centroid for joining its cluster.
+            block_size: New claims compared to the centroids at a time.
+
+        Returns:
+            (labels, changed): the cluster id of each new claim, and the ids of every
+            cluster created or grown.
+        """
+        embeddings = normalize_rows(embeddings)
+        labels = np.full(len(embeddings), -1, dtype=np.int64)
+
+        if len(self.cluster_ids) and len(embeddings):
+            centroids = self.centroids
+            for start in range(0, len(embeddings), block_size):
+                sim = embeddings[start:start + block_size] @ centroids.T
+                best = np.argmax(sim, axis=1)
+                close = 1.0 - sim[np.arange(len(best)), best] <= dist_thresh
+                labels[start:start + block_size][close] = self.cluster_ids[best[close]]
+
+        unmatched = labels == -1
+        if unmatched.any():
+            new_labels = threshold_labels(embeddings[unmatched], dist_thresh, block_size) + self.next_id
+            labels[unmatched] = new_labels
+            new_ids = np.unique(new_labels)
+            # New ids are above every existing id, so appending keeps cluster_ids sorted
+            self.cluster_ids = np.concatenate([self.cluster_ids, new_ids])
+            dim = embeddings.shape[1]
+            self.sums = np.concatenate([
+                self.sums.reshape(-1, dim), np.zeros((len(new_ids), dim), dtype=np.float32)
+            ])
+            self.sizes = np.concatenate([self.sizes, np.zeros(len(new_ids), dtype=np.int64)])
+
+        positions = np.searchsorted(self.cluster_ids, labels)
+        np.add.at(self.sums, positions, embeddings)
+        self.sizes += np.bincount(positions, minlength=len(self.cluster_ids))
+        return labels, np.unique(labels)
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import time
+from typing import Any, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from database.connection import get_async_pool
+from database.vector_store import VectorStore
+
+
+class AsyncVectorStore:
+    """
+    Async similarity search over the embeddings table, for services answering many
+    concurrent queries. Queries share the asyncpg pool from database.connection, and
+    embedding/result formatting reuse a VectorStore.
+    """
+
+    def __init__(self, vector_store: Optional[VectorStore] = None):
+        self.vector_store = vector_store or VectorStore()
+        table_name = self.vector_store.vector_settings.table_name.replace('"', '""')
+        self._search_sql = f"""
+            SELECT id, metadata, contents, embedding, embedding <=> $1 AS distance
+            FROM "{table_name}"
+            WHERE $3::jsonb IS NULL OR metadata @> $3::jsonb
+            ORDER BY embedding <=> $1
+            LIMIT $2
+        """
+
+    async def search(
+        self,
+        query_text: str,
+        limit: int = 5,
+        metadata_filter: Optional[dict] = None,
+        return_dataframe: bool = True,
+        columns: Optional[List[str]] = None,
+        include_embedding: bool = True,
+    ) -> Union[List[Tuple[Any, ...]], pd.DataFrame]:
+        """
+        Query the vector database for similar embeddings based on input text.
+
+        Args:
+            query_text: The input text to search for.
+            limit: The maximum number of results to return.
+            metadata_filter: A dictionary for equality-based (jsonb containment) metadata filtering.
+            return_dataframe: Whether to return results as a DataFrame (default: True).
+            columns: Only return these columns, as for VectorStore.search.
+            include_embedding: Whether to keep the embedding vector in the results.
+
+        Returns:
+            Either a list of tuples or a pandas DataFrame containing the search results.
+        """
+        # Embedding goes through the (blocking) provider and cache, keep it off the event loop
+        embedding = await asyncio.to_thread(self.vector_store.get_embedding, query_text)
+        return await self.search_embedding(
+            embedding, limit, metadata_filter, return_dataframe, columns, include_embedding
+        )
+
+    async def search_embedding(
+        self,
+        embedding: List[float],
+        limit: int = 5,
+        metadata_filter: Optional[dict] = None,
+        return_dataframe: bool = True,
+        columns: Optional[List[str]] = None,
+        include_embedding: bool = True,
+    ) -> Union[List[Tuple[Any, ...]], pd.DataFrame]:
+        """Same as search, for a precomputed query embedding."""
+        start_time = time.time()
+        pool = await get_async_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                self._search_sql,
+                np.asarray(embedding, dtype=np.float32),
+                limit,
+                metadata_filter,
+            )
+        results = [tuple(row) for row in rows]
+        elapsed_time = time.time() - start_time
+        logging.info(f"Async vector search completed in {elapsed_time:.3f} seconds")
+
+        if return_dataframe:
+            return self.vector_store._create_dataframe_from_results(results, columns, include_embedding)
+        return self.vector_store._project_results(results, columns, include_embedding)
+
+    async def search_many(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        metadata_filter: Optional[dict] = None,
+        return_dataframe: bool = True,
+        columns: Optional[List[str]] = None,
+        include_embedding: bool = True,
+    ) -> List[Union[List[Tuple[Any, ...]], pd.DataFrame]]:
+        """Run searches for many query texts concurrently over the pool, results aligned with queries."""
+        embeddings = await asyncio.to_thread(self.vector_store.get_embeddings, queries)
+        return await asyncio.gather(*(
+            self.search_embedding(
+                embedding, limit, metadata_filter, return_dataframe, columns, include_embedding
+            )
+            for embedding in embeddings
+        ))
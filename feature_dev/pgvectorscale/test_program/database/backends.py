@@ -0,0 +1,23 @@
+from typing import Optional
+
+from config.settings import get_settings
+from database.vector_store import VectorStore
+
+
+def get_vector_store(backend: Optional[str] = None) -> VectorStore:
+    """
+    Create the VectorStore backend named by settings.vector_store.backend.
+
+    Args:
+        backend: Override the configured backend ("timescale" or "local").
+
+    Returns:
+        A VectorStore, or a LocalVectorStore for the in-process backend.
+    """
+    backend = backend or get_settings().vector_store.backend
+    if backend == "timescale":
+        return VectorStore()
+    if backend == "local":
+        from database.local_vector_store import LocalVectorStore
+        return LocalVectorStore()
+    raise ValueError(f"Unsupported vector store backend: {backend}")
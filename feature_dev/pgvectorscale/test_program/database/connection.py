@@ -0,0 +1,107 @@
+"""
+Shared, pooled database connections so each tool doesn't open its own.
+
+    get_engine()        SQLAlchemy engine (pandas to_sql, ORM sessions)
+    get_pool()          psycopg connection pool (COPY, raw SQL), pgvector types registered
+    get_async_pool()    asyncpg pool for concurrent searches from async services
+"""
+
+import asyncio
+import json
+import logging
+import re
+from functools import lru_cache
+from typing import Optional
+
+import asyncpg
+from pgvector.asyncpg import register_vector as register_vector_async
+from pgvector.psycopg import register_vector
+from psycopg_pool import ConnectionPool
+from sqlalchemy import Engine, create_engine
+
+from config.settings import get_settings
+
+
+def sqlalchemy_url(service_url: str) -> str:
+    """
+    SQLAlchemy URL for a libpq style service URL, using the psycopg 3 driver.
+
+    TIMESCALE_SERVICE_URL is usually "postgres://..." (see example.env), which libpq,
+    psycopg and asyncpg accept but SQLAlchemy 2.x has no dialect for.
+    """
+    return re.sub(r"^postgres(ql)?://", "postgresql+psycopg://", service_url)
+
+
+@lru_cache()
+def get_engine() -> Engine:
+    """Create and return the shared, pooled SQLAlchemy engine."""
+    db_settings = get_settings().database
+    return create_engine(
+        sqlalchemy_url(db_settings.service_url),
+        pool_size=db_settings.pool_size,
+        max_overflow=db_settings.max_overflow,
+        pool_timeout=db_settings.pool_timeout,
+        pool_pre_ping=True,
+    )
+
+
+@lru_cache()
+def get_pool() -> ConnectionPool:
+    """Create and return the shared psycopg connection pool."""
+    db_settings = get_settings().database
+    pool = ConnectionPool(
+        db_settings.service_url,
+        min_size=db_settings.pool_min_size,
+        max_size=db_settings.pool_size + db_settings.max_overflow,
+        timeout=db_settings.pool_timeout,
+        configure=register_vector,
+        open=True,
+    )
+    logging.info(f"Opened psycopg pool (max {pool.max_size} connections)")
+    return pool
+
+
+_async_pool: Optional[asyncpg.Pool] = None
+# Concurrent first callers (asyncio.gather in search_many) must not each open a pool
+_async_pool_lock = asyncio.Lock()
+
+
+async def _init_async_connection(conn: asyncpg.Connection) -> None:
+    await register_vector_async(conn)
+    await conn.set_type_codec("jsonb", encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+
+
+async def get_async_pool() -> asyncpg.Pool:
+    """Create (on first call) and return the shared asyncpg pool."""
+    global _async_pool
+    if _async_pool is not None:
+        return _async_pool
+    async with _async_pool_lock:
+        if _async_pool is None:
+            db_settings = get_settings().database
+            _async_pool = await asyncpg.create_pool(
+                db_settings.service_url,
+                min_size=db_settings.pool_min_size,
+                max_size=db_settings.pool_size + db_settings.max_overflow,
+                init=_init_async_connection,
+            )
+            logging.info(f"Opened asyncpg pool (max {db_settings.pool_size + db_settings.max_overflow} connections)")
+    return _async_pool
+
+
+async def close_async_pool() -> None:
+    global _async_pool
+    async with _async_pool_lock:
+        if _async_pool is not None:
+            await _async_pool.close()
+            _async_pool = None
+
+
+def close_pools() -> None:
+    """Close the sync pools, e.g. at the end of a script."""
+    if get_pool.cache_info().currsize:
+        get_pool().close()
+        get_pool.cache_clear()
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+        get_engine.cache_clear()
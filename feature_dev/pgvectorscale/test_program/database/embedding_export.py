@@ -0,0 +1,72 @@
+import logging
+import time
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from psycopg import sql
+
+from database.connection import get_pool
+
+
+def stream_embeddings(
+    query: Union[str, sql.Composable],
+    dim: int,
+    params: Sequence[Any] = (),
+    memmap_path: Optional[Union[str, Path]] = None,
+    chunk_size: int = 10_000,
+) -> Tuple[List[str], List[str], np.ndarray]:
+    """
+    Stream (id, contents, embedding) rows into a preallocated float32 matrix.
+
+    Rows are read through a server-side cursor chunk_size at a time and copied straight
+    into the matrix, so only one chunk of rows is ever held as Python objects. The row
+    count and the rows come from one REPEATABLE READ snapshot, so the preallocated
+    size is exact.
+
+    Args:
+        query: SELECT returning id, contents and embedding columns, in that order.
+        dim: Embedding dimensions.
+        params: Query parameters.
+        memmap_path: Write the matrix to this .npy file (np.load(path, mmap_mode="r")
+            reopens it) instead of holding it in RAM.
+        chunk_size: Rows fetched per round trip.
+
+    Returns:
+        (ids, contents, embeddings) with embeddings as an (N, dim) float32 array or memmap.
+    """
+    if isinstance(query, str):
+        query = sql.SQL(query)
+    start_time = time.time()
+
+    with get_pool().connection() as conn:
+        conn.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        count = conn.execute(
+            sql.SQL("SELECT count(*) FROM ({}) AS export").format(query), params
+        ).fetchone()[0]
+
+        if memmap_path:
+            embeddings = np.lib.format.open_memmap(
+                memmap_path, mode="w+", dtype=np.float32, shape=(count, dim)
+            )
+        else:
+            embeddings = np.empty((count, dim), dtype=np.float32)
+        ids: List[str] = []
+        contents: List[str] = []
+
+        with conn.cursor(name="embedding_export") as cur:
+            cur.itersize = chunk_size
+            cur.execute(query, params)
+            while rows := cur.fetchmany(chunk_size):
+                offset = len(ids)
+                for i, (id_, text, embedding) in enumerate(rows):
+                    embeddings[offset + i] = embedding
+                    ids.append(str(id_))
+                    contents.append(text)
+
+    if isinstance(embeddings, np.memmap):
+        embeddings.flush()
+    logging.info(
+        f"Exported {len(ids)} embeddings ({embeddings.nbytes / 1e6:.1f} MB) in {time.time() - start_time:.3f} seconds"
+    )
+    return ids, contents, embeddings
@@ -0,0 +1,205 @@
+import logging
+import time
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+def blocked_top_k(
+    num_rows: int,
+    num_queries: int,
+    k: int,
+    block_size: int,
+    score_block: Callable[[int, int], np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Running top-k over a matrix scored block by block (higher score is better).
+
+    Args:
+        num_rows: Rows in the searched matrix.
+        num_queries: Number of queries.
+        k: Results per query.
+        block_size: Rows scored per call to score_block.
+        score_block: score_block(start, stop) returns the (num_queries, stop - start) scores
+            of that row block, -inf for rows that must not be returned.
+
+    Returns:
+        (rows, scores), each (num_queries, k) sorted best first, padded with row -1 and
+        score -inf when fewer than k rows are valid.
+    """
+    best_scores = np.full((num_queries, k), -np.inf, dtype=np.float32)
+    best_rows = np.full((num_queries, k), -1, dtype=np.int64)
+
+    for start in range(0, num_rows, block_size):
+        stop = min(start + block_size, num_rows)
+        scores = score_block(start, stop)
+
+        # Keep the block's own top-k, then merge into the running top-k
+        block_k = min(k, stop - start)
+        top = np.argpartition(-scores, block_k - 1, axis=1)[:, :block_k]
+        cand_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+        cand_rows = np.concatenate([best_rows, top + start], axis=1)
+        keep = np.argpartition(-cand_scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(cand_scores, keep, axis=1)
+        best_rows = np.take_along_axis(cand_rows, keep, axis=1)
+
+    order = np.argsort(-best_scores, axis=1)
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    best_rows = np.take_along_axis(best_rows, order, axis=1)
+    best_rows[np.isneginf(best_scores)] = -1
+    return best_rows, best_scores
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length (zero rows stay zero), as float32."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+class ExactSearcher:
+    """
+    Exact (brute-force) cosine nearest-neighbour search over an embeddings matrix.
+
+    Scores queries against the matrix in row blocks with float32 matrix multiplies (BLAS)
+    and keeps a running top-k per query with argpartition, so memory stays at
+    queries x block_size regardless of corpus size. Works on np.memmap matrices.
+    """
+
+    def __init__(self, embeddings: np.ndarray, block_size: int = 65_536):
+        """
+        Args:
+            embeddings: (N, dim) matrix, float32 avoids a copy.
+            block_size: Rows scored per matrix multiply.
+        """
+        self.embeddings = embeddings if embeddings.dtype == np.float32 else embeddings.astype(np.float32)
+        self.block_size = block_size
+        self.inv_norms = np.empty(len(self.embeddings), dtype=np.float32)
+        for start in range(0, len(self.embeddings), block_size):
+            block = self.embeddings[start:start + block_size]
+            norms = np.linalg.norm(block, axis=1)
+            # All-zero rows (unused memmap capacity) never match
+            self.inv_norms[start:start + block_size] = np.divide(
+                1.0, norms, out=np.zeros_like(norms), where=norms > 0
+            )
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        mask: Optional[np.ndarray] = None,
+        rows: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k nearest rows to each query by cosine distance.
+
+        Args:
+            queries: (Q, dim) query embeddings.
+            k: Neighbours per query.
+            mask: Optional boolean array over rows, only True rows are returned.
+            rows: Optional (Q, C) candidate rows per query (-1 for none) to rank instead of
+                scanning the whole matrix, e.g. to re-rank approximate results.
+
+        Returns:
+            (indices, distances), each (Q, k) sorted nearest first. Rows past the number
+            of candidates are padded with index -1 and distance inf.
+        """
+        queries = normalize_rows(queries)
+        if rows is not None:
+            return self._rank_candidates(queries, k, rows)
+
+        def score_block(start: int, stop: int) -> np.ndarray:
+            scores = queries @ self.embeddings[start:stop].T
+            scores *= self.inv_norms[start:stop]
+            invalid = self.inv_norms[start:stop] == 0
+            if mask is not None:
+                invalid |= ~mask[start:stop]
+            scores[:, invalid] = -np.inf
+            return scores
+
+        best_rows, best_scores = blocked_top_k(
+            len(self.embeddings), len(queries), k, self.block_size, score_block
+        )
+        distances = np.where(np.isneginf(best_scores), np.inf, 1.0 - best_scores)
+        return best_rows, distances
+
+    def _rank_candidates(self, queries: np.ndarray, k: int, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        safe_rows = np.where(rows >= 0, rows, 0)
+        candidates = self.embeddings[safe_rows.ravel()].reshape(*rows.shape, -1)
+        scores = np.einsum("qcd,qd->qc", candidates, queries) * self.inv_norms[safe_rows]
+        scores[(rows < 0) | (self.inv_norms[safe_rows] == 0)] = -np.inf
+
+        k = min(k, rows.shape[1])
+        top = np.argsort(-scores, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, top, axis=1)
+        best_rows = np.take_along_axis(rows, top, axis=1)
+        missing = np.isneginf(best_scores)
+        best_rows[missing] = -1
+        return best_rows, np.where(missing, np.inf, 1.0 - best_scores)
+
+
+def recall_at_k(
+    vector_store,
+    queries: List[str],
+    k: int = 10,
+    ids: Optional[List[str]] = None,
+    embeddings: Optional[np.ndarray] = None,
+) -> dict:
+    """
+    Measure the recall@k the vector store's ANN search delivers, against exact search.
+
+    Args:
+        vector_store: A VectorStore (or LocalVectorStore) to benchmark.
+        queries: Query texts, e.g. a sample of claim texts.
+        k: Neighbours per query.
+        ids, embeddings: The corpus to search exactly, loaded with export_embeddings if omitted.
+
+    Returns:
+        A dict with mean recall, per-query recalls and ANN vs exact search seconds.
+    """
+    if embeddings is None:
+        ids, _, embeddings = vector_store.export_embeddings()
+    query_embeddings = np.asarray(vector_store.get_embeddings(queries), dtype=np.float32)
+
+    start_time = time.time()
+    ann_results = vector_store.search_many(
+        query_embeddings, limit=k, return_dataframe=False, columns=["id"]
+    )
+    ann_seconds = time.time() - start_time
+
+    start_time = time.time()
+    exact_rows, _ = ExactSearcher(embeddings).search(query_embeddings, k)
+    exact_seconds = time.time() - start_time
+
+    recalls = []
+    for ann, rows in zip(ann_results, exact_rows):
+        truth = {ids[row] for row in rows if row >= 0}
+        found = {str(id_) for (id_,) in ann}
+        recalls.append(len(truth & found) / len(truth) if truth else 1.0)
+
+    report = {
+        "k": k,
+        "queries": len(queries),
+        "recall": float(np.mean(recalls)) if recalls else 1.0,
+        "recalls": recalls,
+        "ann_seconds": ann_seconds,
+        "exact_seconds": exact_seconds,
+    }
+    logging.info(
+        f"recall@{k} = {report['recall']:.3f} over {len(queries)} queries "
+        f"(ANN {ann_seconds:.3f}s, exact {exact_seconds:.3f}s)"
+    )
+    return report
+
+
+# Run from test_program as a module (the package imports need it on sys.path): python -m database.exact_search
+if __name__ == "__main__":
+    import random
+    from database.backends import get_vector_store
+
+    vec = get_vector_store()
+    corpus_ids, texts, corpus = vec.export_embeddings()
+    sample = random.sample(texts, min(100, len(texts)))
+    result = recall_at_k(vec, sample, k=10, ids=corpus_ids, embeddings=corpus)
+    print(f"recall@{result['k']}: {result['recall']:.3f}")
+    print(f"ANN search: {result['ann_seconds']:.3f}s  exact search: {result['exact_seconds']:.3f}s")
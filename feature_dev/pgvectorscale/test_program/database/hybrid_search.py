@@ -0,0 +1,76 @@
+import re
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+SEARCH_MODES = ("auto", "hybrid", "lexical")
+
+# Lowercase connectives allowed inside a name ("Tren de Aragua", "Bank of America")
+NAME_PARTICLES = {"de", "del", "la", "of", "the", "and", "for", "van", "von", "al", "el", "bin"}
+
+
+def exact_phrase(query: str, max_terms: int = 4) -> Optional[str]:
+    """
+    Phrase to look up lexically if the query is an exact name, None otherwise.
+
+    Quoted queries ('"border wall"') are always exact. Unquoted ones are exact when they
+    are short and every word is capitalized, an acronym or a name particle:
+    "Tren de Aragua", "ICE", "Joe Biden", but not "who is Joe Biden".
+
+    Args:
+        query: Search text.
+        max_terms: Longest unquoted query treated as a name.
+
+    Returns:
+        The phrase without quotes, or None.
+    """
+    query = query.strip()
+    quoted = re.fullmatch(r"[\"“](.+)[\"”]", query)
+    if quoted:
+        return quoted.group(1).strip() or None
+    words = query.split()
+    if not words or len(words) > max_terms:
+        return None
+    if words[0].lower() in NAME_PARTICLES:
+        return None
+    for word in words:
+        if word.lower() in NAME_PARTICLES:
+            continue
+        if not word[0].isupper() and not word[0].isdigit():
+            return None
+    return query
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Hashable]],
+    k: int = 60,
+) -> List[Tuple[Hashable, float]]:
+    """
+    Fuse ranked id lists: score(id) = sum over lists of 1 / (k + rank), rank starting at 1.
+
+    Only ranks are used, so lexical and vector scores never need to be on the same
+    scale. An id ranked within the top k by both rankings beats one ranked first by
+    only one of them.
+
+    Returns:
+        (id, score) pairs, best first.
+    """
+    scores: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, id_ in enumerate(ranking, start=1):
+            scores[id_] = scores.get(id_, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+def fts5_query(text: str, phrase: bool = False) -> Optional[str]:
+    """
+    SQLite FTS5 MATCH expression for free text, None if it has no searchable words.
+
+    Words are quoted so FTS5 operators in user text are taken literally. Free text
+    ORs its words (bm25 ranks documents matching more of them higher), a phrase
+    must appear as written.
+    """
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return None
+    if phrase:
+        return '"' + " ".join(words) + '"'
+    return " OR ".join(f'"{word}"' for word in dict.fromkeys(words))
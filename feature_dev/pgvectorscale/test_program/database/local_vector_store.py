@@ -0,0 +1,614 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+import hnswlib
+import numpy as np
+import pandas as pd
+
+from config.settings import get_settings
+from database.embedding_cache import EmbeddingCache, normalize_text
+from database.exact_search import ExactSearcher
+from database.hybrid_search import fts5_query, reciprocal_rank_fusion
+from database.quantization import QuantizedSearcher
+from database.result_cache import SearchResultCache
+from services.embedding_factory import EmbeddingFactory
+from database.vector_store import VectorStore
+
+# Gregorian -> unix epoch offset for uuid1 timestamps, in 100ns intervals
+UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+
+def uuid_time(id_: str) -> Optional[float]:
+    """Unix timestamp encoded in a uuid1 id (as made by uuid_from_time), None for other ids."""
+    try:
+        parsed = uuid.UUID(str(id_))
+    except ValueError:
+        return None
+    if parsed.version != 1:
+        return None
+    return (parsed.time - UUID_EPOCH_OFFSET) / 1e7
+
+
+class LocalVectorStore(VectorStore):
+    """
+    VectorStore backend that runs in-process, no Postgres needed.
+
+    Embeddings live in a memory-mapped float32 matrix (vectors.f32) and ids, metadata
+    and contents in SQLite (records.sqlite), all under settings.local_index.path.
+
+    Searches go through an HNSW index (hnsw.bin), or run exactly by brute force with
+    local_index.method = "exact". Exact search can scan int8/binary codes kept in RAM
+    instead (local_index.quantization), re-ranking only the top candidates from the matrix.
+
+    Contents are also kept in an FTS5 table (BM25 ranked) for hybrid_search. Supports the
+    same upsert/search/delete/metadata filter calls as VectorStore, for laptops, CI and
+    small corpora.
+    """
+
+    def __init__(self, index_dir: Optional[Union[str, Path]] = None):
+        """Open (or create) the local index, and set up the embedding provider and caches."""
+        self.settings = get_settings()
+        self.embedder = EmbeddingFactory().embedder
+        self.embedding_model = self.embedder.model_id
+        self.vector_settings = self.settings.vector_store
+        self.index_settings = self.settings.local_index
+        self.embedding_cache = None
+        if self.settings.embedding_cache.enabled:
+            self.embedding_cache = EmbeddingCache(self.settings.embedding_cache.path)
+        self.search_cache = None
+        if self.settings.search_cache.enabled:
+            self.search_cache = SearchResultCache(
+                maxsize=self.settings.search_cache.maxsize,
+                ttl=self.settings.search_cache.ttl_seconds,
+            )
+        self.last_index_build_seconds: Optional[float] = None
+        self.polarity_reranker = None
+
+        # Codes are only searched by the brute-force path, the HNSW index holds float32 vectors
+        if self.index_settings.quantization != "none" and self.index_settings.method != "exact":
+            raise ValueError(
+                f"local_index.quantization = {self.index_settings.quantization!r} needs "
+                f"local_index.method = 'exact' (got {self.index_settings.method!r})"
+            )
+        self.dim = self.vector_settings.embedding_dimensions
+        self.index_dir = Path(index_dir or self.index_settings.path)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._quantized: Optional[QuantizedSearcher] = None
+        self._db = sqlite3.connect(self.index_dir / "records.sqlite", check_same_thread=False)
+        self.create_tables()
+        self._open_index()
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def create_tables(self) -> None:
+        """Create the record table (row number, id, metadata, contents, uuid time) and its full-text table."""
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                row INTEGER PRIMARY KEY,
+                id TEXT UNIQUE NOT NULL,
+                metadata TEXT,
+                contents TEXT,
+                created REAL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS records_created ON records(created)")
+        self._db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5(contents, tokenize='porter unicode61')"
+        )
+        self._db.commit()
+        # Indexes from before the full-text table existed
+        if not self._db.execute("SELECT 1 FROM records_fts LIMIT 1").fetchone():
+            self.create_text_index()
+
+    def create_text_index(self) -> None:
+        """Rebuild the FTS5 full-text table from the records, rowid = row."""
+        with self._lock:
+            self._db.execute("DELETE FROM records_fts")
+            self._db.execute("INSERT INTO records_fts (rowid, contents) SELECT row, contents FROM records")
+            self._db.commit()
+
+    def _open_index(self) -> None:
+        next_row = self._db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM records").fetchone()[0]
+        vectors_path = self.index_dir / "vectors.f32"
+        stored_rows = vectors_path.stat().st_size // (self.dim * 4) if vectors_path.exists() else 0
+        self.capacity = max(self.index_settings.initial_capacity, next_row, stored_rows)
+        self.next_row = next_row
+        self._open_vectors(self.capacity)
+
+        self.index = hnswlib.Index(space="cosine", dim=self.dim)
+        index_path = self.index_dir / "hnsw.bin"
+        if index_path.exists():
+            self.index.load_index(str(index_path), max_elements=self.capacity)
+        else:
+            self.create_index()
+        self.index.set_ef(self.index_settings.ef_search)
+
+    def _open_vectors(self, capacity: int) -> None:
+        path = self.index_dir / "vectors.f32"
+        size = capacity * self.dim * 4
+        with open(path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self.vectors = np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _grow(self, needed: int) -> None:
+        """Grow the matrix and index to hold at least `needed` rows."""
+        if needed <= self.capacity:
+            return
+        new_capacity = max(needed, self.capacity * 2)
+        self.vectors.flush()
+        del self.vectors
+        self._open_vectors(new_capacity)
+        self.index.resize_index(new_capacity)
+        self.capacity = new_capacity
+        logging.info(f"Grew local index to {new_capacity} rows")
+
+    def create_index(self, **index_params) -> None:
+        """
+        (Re)build the HNSW index over every stored vector.
+
+        Args:
+            index_params: hnswlib build parameters (M, ef_construction) overriding settings.local_index.
+        """
+        params = {
+            "M": self.index_settings.M,
+            "ef_construction": self.index_settings.ef_construction,
+        }
+        params.update(index_params)
+        start_time = time.time()
+        self.index = hnswlib.Index(space="cosine", dim=self.dim)
+        self.index.init_index(max_elements=self.capacity, allow_replace_deleted=False, **params)
+        rows = np.array([row for (row,) in self._db.execute("SELECT row FROM records")], dtype=np.int64)
+        if len(rows):
+            self.index.add_items(self.vectors[rows], rows)
+        self.index.set_ef(self.index_settings.ef_search)
+        self.last_index_build_seconds = time.time() - start_time
+        self.save()
+        logging.info(
+            f"Built local HNSW index over {len(rows)} vectors in {self.last_index_build_seconds:.3f} seconds"
+        )
+
+    def drop_index(self) -> None:
+        """Remove the saved HNSW index, create_index rebuilds it from the stored vectors."""
+        (self.index_dir / "hnsw.bin").unlink(missing_ok=True)
+
+    def save(self) -> None:
+        """Flush vectors and write the HNSW index to disk."""
+        with self._lock:
+            self.vectors.flush()
+            self.index.save_index(str(self.index_dir / "hnsw.bin"))
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def upsert(self, df: pd.DataFrame) -> None:
+        """
+        Insert or update records from a pandas DataFrame.
+
+        Args:
+            df: A pandas DataFrame containing the data to insert or update.
+                Expected columns: id, metadata, contents, embedding
+        """
+        if df.empty:
+            return
+        with self._lock:
+            rows = self._write_records(df)
+            # hnswlib updates the vector in place when a label already exists
+            self.index.add_items(self.vectors[rows], rows)
+            self.save()
+        self._invalidate_search_cache()
+        logging.info(f"Inserted {len(df)} records into local index {self.index_dir}")
+
+    def _write_records(self, df: pd.DataFrame) -> np.ndarray:
+        """Write records to the vector matrix and SQLite, leaving the HNSW index alone. Returns their rows."""
+        with self._lock:
+            ids = [str(id_) for id_ in df.iloc[:, 0]]
+            existing = self._rows_for_ids(ids)
+            rows = []
+            for id_ in ids:
+                if id_ not in existing:
+                    existing[id_] = self.next_row
+                    self.next_row += 1
+                rows.append(existing[id_])
+            self._grow(self.next_row)
+
+            rows = np.array(rows, dtype=np.int64)
+            vectors = np.asarray(df.iloc[:, 3].tolist(), dtype=np.float32)
+            self.vectors[rows] = vectors
+
+            self._db.executemany(
+                "INSERT OR REPLACE INTO records (row, id, metadata, contents, created) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (int(row), id_, json.dumps(metadata), contents, uuid_time(id_))
+                    for row, id_, metadata, contents in zip(rows, ids, df.iloc[:, 1], df.iloc[:, 2])
+                ],
+            )
+            self._db.executemany("DELETE FROM records_fts WHERE rowid = ?", [(int(row),) for row in rows])
+            self._db.executemany(
+                "INSERT INTO records_fts (rowid, contents) VALUES (?, ?)",
+                [(int(row), contents) for row, contents in zip(rows, df.iloc[:, 2])],
+            )
+            self._db.commit()
+            self._quantized = None
+        return rows
+
+    def bulk_upsert(
+        self,
+        data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        chunk_size: Optional[int] = None,
+        update_index: bool = True,
+    ) -> int:
+        """
+        Upsert a DataFrame or iterable of DataFrames in chunks, returning the row count.
+
+        Chunks only write the vector matrix and SQLite. The written rows are added to the
+        HNSW index and the index saved once at the end, or not at all with
+        update_index=False (bulk_load rebuilds it instead).
+        """
+        chunk_size = chunk_size or self.vector_settings.bulk_chunk_size
+        if isinstance(data, pd.DataFrame):
+            data = [data]
+        total = 0
+        written = []
+        for df in data:
+            for i in range(0, len(df), chunk_size):
+                chunk = df.iloc[i:i + chunk_size]
+                if chunk.empty:
+                    continue
+                rows = self._write_records(chunk)
+                if update_index:
+                    written.append(rows)
+                self._invalidate_search_cache()
+                total += len(chunk)
+        with self._lock:
+            for rows in written:
+                self.index.add_items(self.vectors[rows], rows)
+            if written:
+                self.save()
+            else:
+                self.vectors.flush()
+        logging.info(f"Bulk upserted {total} records into local index {self.index_dir}")
+        return total
+
+    def bulk_load(
+        self,
+        data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        chunk_size: Optional[int] = None,
+        **index_params,
+    ) -> dict:
+        """Bulk upsert with the HNSW index deferred, then build and save it once, returning index_health."""
+        self.bulk_upsert(data, chunk_size=chunk_size, update_index=False)
+        self.create_index(**index_params)
+        return self.index_health()
+
+    def delete(
+        self,
+        ids: List[str] = None,
+        metadata_filter: dict = None,
+        delete_all: bool = False,
+    ) -> None:
+        """Delete records from the local index, same arguments as VectorStore.delete."""
+        if sum(bool(x) for x in (ids, metadata_filter, delete_all)) != 1:
+            raise ValueError(
+                "Provide exactly one of: ids, metadata_filter, or delete_all"
+            )
+
+        with self._lock:
+            if delete_all:
+                rows = [row for (row,) in self._db.execute("SELECT row FROM records")]
+            elif ids:
+                rows = list(self._rows_for_ids([str(id_) for id_ in ids]).values())
+            else:
+                rows = sorted(self._rows_matching(metadata_filter))
+
+            for row in rows:
+                self.index.mark_deleted(int(row))
+            self._db.executemany("DELETE FROM records WHERE row = ?", [(int(row),) for row in rows])
+            self._db.executemany("DELETE FROM records_fts WHERE rowid = ?", [(int(row),) for row in rows])
+            self._db.commit()
+            self.save()
+            self._quantized = None
+        self._invalidate_search_cache()
+        logging.info(f"Deleted {len(rows)} records from local index {self.index_dir}")
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _rows_for_ids(self, ids: List[str]) -> dict:
+        found = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            found.update(self._db.execute(
+                f"SELECT id, row FROM records WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall())
+        return found
+
+    def _rows_matching(
+        self,
+        metadata_filter: Optional[Union[dict, List[dict]]] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+    ) -> set:
+        """Rows passing an equality metadata filter (dict, or list of dicts OR'd) and time range."""
+        where, params = self._filter_clause(metadata_filter, time_range)
+        return {row for (row,) in self._db.execute(f"SELECT row FROM records WHERE {where}", params)}
+
+    @staticmethod
+    def _filter_clause(
+        metadata_filter: Optional[Union[dict, List[dict]]] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+    ) -> Tuple[str, List[Any]]:
+        """WHERE condition on the records table for _rows_matching's filters, with its params."""
+        clauses = []
+        params: List[Any] = []
+        if metadata_filter:
+            filters = metadata_filter if isinstance(metadata_filter, list) else [metadata_filter]
+            ors = []
+            for flt in filters:
+                ands = []
+                for key, value in flt.items():
+                    ands.append("json_extract(metadata, ?) = json_extract(?, '$')")
+                    params.extend([f'$."{key}"', json.dumps(value)])
+                ors.append("(" + " AND ".join(ands or ["1"]) + ")")
+            clauses.append("(" + " OR ".join(ors) + ")")
+        if time_range:
+            start_date, end_date = time_range
+            clauses.append("created >= ? AND created < ?")
+            params.extend([start_date.timestamp(), end_date.timestamp()])
+        return " AND ".join(clauses) or "1", params
+
+    def _fetch_results(self, rows: List[int], distances: List[float]) -> List[Tuple[Any, ...]]:
+        """Build (id, metadata, contents, embedding, distance) tuples for index rows, in order (distance may be None)."""
+        if not rows:
+            return []
+        records = {}
+        for i in range(0, len(rows), 500):
+            chunk = rows[i:i + 500]
+            for row, id_, metadata, contents in self._db.execute(
+                f"SELECT row, id, metadata, contents FROM records WHERE row IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ):
+                records[row] = (id_, json.loads(metadata) if metadata else {}, contents)
+        results = []
+        for row, distance in zip(rows, distances):
+            if row in records:
+                id_, metadata, contents = records[row]
+                distance = float(distance) if distance is not None else None
+                results.append((id_, metadata, contents, np.array(self.vectors[row]), distance))
+        return results
+
+    def _knn(
+        self,
+        query_embeddings: np.ndarray,
+        limit: int,
+        metadata_filter: Optional[Union[dict, List[dict]]] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+    ) -> List[List[Tuple[Any, ...]]]:
+        """Nearest neighbours for each query row, restricted to rows passing the filters."""
+        count = self._db.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        allowed = None
+        if metadata_filter or time_range:
+            allowed = self._rows_matching(metadata_filter, time_range)
+            count = len(allowed)
+        k = min(limit, count)
+        if k == 0:
+            return [[] for _ in range(len(query_embeddings))]
+
+        if self.index_settings.method == "exact":
+            labels, distances = self._exact_knn(query_embeddings, k, allowed)
+        else:
+            kwargs = {}
+            if allowed is not None:
+                kwargs["filter"] = lambda label: label in allowed
+            self.index.set_ef(max(self.index_settings.ef_search, k))
+            labels, distances = self.index.knn_query(query_embeddings, k=k, **kwargs)
+        return [
+            self._fetch_results([int(label) for label in row_labels], row_distances)
+            for row_labels, row_distances in zip(labels, distances)
+        ]
+
+    def _exact_knn(
+        self,
+        query_embeddings: np.ndarray,
+        k: int,
+        allowed: Optional[set] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force nearest neighbours over the stored rows of the vector matrix (or its codes)."""
+        rows = allowed
+        if rows is None:
+            rows = {row for (row,) in self._db.execute("SELECT row FROM records")}
+        mask = np.zeros(self.next_row, dtype=bool)
+        mask[list(rows)] = True
+        if self.index_settings.quantization == "none":
+            searcher = ExactSearcher(self.vectors[:self.next_row])
+        else:
+            # Codes are rebuilt on the first search after a write
+            if self._quantized is None:
+                self._quantized = QuantizedSearcher(
+                    self.vectors[:self.next_row],
+                    self.index_settings.quantization,
+                    rerank_factor=self.index_settings.rerank_factor,
+                )
+            searcher = self._quantized
+        return searcher.search(query_embeddings, k, mask=mask)
+
+    def export_embeddings(
+        self,
+        memmap_path: Optional[Union[str, Path]] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Tuple[List[str], List[str], np.ndarray]:
+        """Every stored record's id, contents and embedding, same arguments as VectorStore.export_embeddings."""
+        records = self._db.execute("SELECT row, id, contents FROM records ORDER BY row").fetchall()
+        rows = np.array([row for row, _, _ in records], dtype=np.int64)
+        if memmap_path:
+            chunk_size = chunk_size or self.vector_settings.bulk_chunk_size
+            embeddings = np.lib.format.open_memmap(
+                memmap_path, mode="w+", dtype=np.float32, shape=(len(rows), self.dim)
+            )
+            for start in range(0, len(rows), chunk_size):
+                embeddings[start:start + chunk_size] = self.vectors[rows[start:start + chunk_size]]
+            embeddings.flush()
+        else:
+            embeddings = self.vectors[rows]
+        return [id_ for _, id_, _ in records], [contents for _, _, contents in records], embeddings
+
+    def search(
+        self,
+        query_text: str,
+        limit: int = 5,
+        metadata_filter: Union[dict, List[dict]] = None,
+        predicates: Optional[Any] = None,
+        time_range: Optional[Tuple[datetime, datetime]] = None,
+        return_dataframe: bool = True,
+        columns: Optional[List[str]] = None,
+        include_embedding: bool = True,
+    ) -> Union[List[Tuple[Any, ...]], pd.DataFrame]:
+        """
+        Query the local index for similar embeddings based on input text.
+
+        Takes the same arguments as VectorStore.search, except that Predicates filters
+        are not supported (use metadata_filter), and time_range applies to uuid1 ids.
+        """
+        if predicates is not None:
+            raise ValueError("LocalVectorStore supports metadata_filter, not Predicates")
+
+        start_time = time.time()
+
+        cache_key = None
+        if self.search_cache:
+            cache_key = self.search_cache.make_key(
+                "search", self.embedding_model, normalize_text(query_text), limit, metadata_filter, time_range
+            )
+            results = self.search_cache.get(cache_key)
+        if not cache_key or results is None:
+            query = np.asarray([self.get_embedding(query_text)], dtype=np.float32)
+            with self._lock:
+                results = self._knn(query, limit, metadata_filter, time_range)[0]
+            if cache_key:
+                self.search_cache.put(cache_key, results)
+
+        elapsed_time = time.time() - start_time
+        logging.info(f"Local vector search completed in {elapsed_time:.3f} seconds")
+
+        if return_dataframe:
+            return self._create_dataframe_from_results(results, columns, include_embedding)
+        return self._project_results(results, columns, include_embedding)
+
+    def search_many(
+        self,
+        queries: Union[List[str], List[List[float]], np.ndarray],
+        limit: int = 5,
+        metadata_filter: Optional[dict] = None,
+        return_dataframe: bool = True,
+        query_batch_size: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+        include_embedding: bool = True,
+    ) -> Union[List[List[Tuple[Any, ...]]], List[pd.DataFrame]]:
+        """Batched search for many query texts or embeddings, same arguments as VectorStore.search_many."""
+        if len(queries) == 0:
+            return []
+        if isinstance(queries[0], str):
+            embeddings = self.get_embeddings(list(queries))
+        else:
+            embeddings = queries
+        query_batch_size = query_batch_size or self.vector_settings.search_batch_size
+
+        grouped = []
+        with self._lock:
+            for offset in range(0, len(embeddings), query_batch_size):
+                batch = np.asarray(embeddings[offset:offset + query_batch_size], dtype=np.float32)
+                grouped.extend(self._knn(batch, limit, metadata_filter))
+
+        if return_dataframe:
+            return [
+                self._create_dataframe_from_results(results, columns, include_embedding)
+                for results in grouped
+            ]
+        return [self._project_results(results, columns, include_embedding) for results in grouped]
+
+    def _bm25_rows(
+        self, match: str, limit: int, metadata_filter: Optional[Union[dict, List[dict]]] = None
+    ) -> List[int]:
+        """Rows matching an FTS5 expression that pass the metadata filter, best BM25 score first."""
+        where, params = self._filter_clause(metadata_filter)
+        return [
+            row for (row,) in self._db.execute(
+                f"""
+                SELECT records.row FROM records_fts JOIN records ON records.row = records_fts.rowid
+                WHERE records_fts MATCH ? AND {where}
+                ORDER BY bm25(records_fts)
+                LIMIT ?
+                """,
+                [match, *params, limit],
+            )
+        ]
+
+    def _lexical_search(
+        self, phrase: str, limit: int, metadata_filter: Optional[Union[dict, List[dict]]]
+    ) -> List[Tuple[Any, ...]]:
+        """Rows containing phrase, best BM25 score first, with a distance of None."""
+        match = fts5_query(phrase, phrase=True)
+        if match is None:
+            return []
+        with self._lock:
+            rows = self._bm25_rows(match, limit, metadata_filter)
+            return self._fetch_results(rows, [None] * len(rows))
+
+    def _fused_search(
+        self,
+        query_text: str,
+        query_embedding: List[float],
+        limit: int,
+        metadata_filter: Optional[Union[dict, List[dict]]],
+    ) -> List[Tuple[Any, ...]]:
+        """BM25 and vector top candidates fused by reciprocal rank."""
+        hybrid_settings = self.vector_settings.hybrid
+        candidates = max(limit, hybrid_settings.candidates)
+        query = np.asarray([query_embedding], dtype=np.float32)
+        match = fts5_query(query_text)
+
+        with self._lock:
+            lexical = self._bm25_rows(match, candidates, metadata_filter) if match else []
+            semantic = self._knn(query, candidates, metadata_filter)[0]
+            semantic_rows = self._rows_for_ids([result[0] for result in semantic])
+            fused = reciprocal_rank_fusion(
+                [lexical, [semantic_rows[result[0]] for result in semantic]], k=hybrid_settings.rrf_k
+            )[:limit]
+            rows = [row for row, _ in fused]
+            if not rows:
+                return []
+            vectors = np.asarray(self.vectors[rows])
+            norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query[0])
+            distances = 1.0 - (vectors @ query[0]) / np.maximum(norms, 1e-12)
+            return self._fetch_results(rows, distances.tolist())
+
+    def index_health(self) -> dict:
+        """Report row count vs. indexed vectors for the local index."""
+        row_count = self._db.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        index_path = self.index_dir / "hnsw.bin"
+        return {
+            "row_count": row_count,
+            "index_name": "hnsw",
+            "indexed_rows": len(self._indexed_rows()),
+            "index_size_bytes": index_path.stat().st_size if index_path.exists() else None,
+            "table_size_bytes": (self.index_dir / "vectors.f32").stat().st_size,
+            "last_build_seconds": self.last_index_build_seconds,
+        }
+
+    def _indexed_rows(self) -> set:
+        """Stored rows that have a live entry in the HNSW index."""
+        stored = {row for (row,) in self._db.execute("SELECT row FROM records")}
+        return stored & set(self.index.get_ids_list())
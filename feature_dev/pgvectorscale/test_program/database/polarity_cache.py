@@ -0,0 +1,98 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from database.embedding_cache import normalize_text
+
+
+class PolarityCache:
+    """
+    Persistent store of NLI label probabilities in SQLite.
+
+    Entries are keyed by sha256 of (model, normalized claim, normalized query) and hold
+    the (entail, contradict, neutral) probabilities, so a claim is only classified
+    against the same query claim once.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Location of the SQLite file.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS polarity "
+            "(key TEXT PRIMARY KEY, entail REAL, contradict REAL, neutral REAL)"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, premise: str, hypothesis: str) -> str:
+        return hashlib.sha256(
+            f"{model}\0{normalize_text(premise)}\0{normalize_text(hypothesis)}".encode("utf-8")
+        ).hexdigest()
+
+    def get_many(self, model: str, pairs: List[Tuple[str, str]]) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached probabilities.
+
+        Args:
+            model: NLI model name the pairs were classified with.
+            pairs: (premise, hypothesis) pairs to look up.
+
+        Returns:
+            A list aligned with pairs holding (entail, contradict, neutral) arrays, or None on a miss.
+        """
+        keys = [self.make_key(model, premise, hypothesis) for premise, hypothesis in pairs]
+        found: Dict[str, np.ndarray] = {}
+        unique_keys = list(set(keys))
+        with self._lock:
+            for i in range(0, len(unique_keys), 500):
+                chunk = unique_keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, entail, contradict, neutral FROM polarity WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, *probs in rows:
+                    found[key] = np.array(probs, dtype=np.float32)
+            results = [found.get(key) for key in keys]
+            hits = sum(result is not None for result in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put_many(self, model: str, pairs: List[Tuple[str, str]], probs: np.ndarray) -> None:
+        """Store (entail, contradict, neutral) probabilities for pairs classified with model."""
+        rows = [
+            (self.make_key(model, premise, hypothesis), *map(float, row))
+            for (premise, hypothesis), row in zip(pairs, probs)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO polarity (key, entail, contradict, neutral) VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def log_stats(self) -> None:
+        total = self.hits + self.misses
+        logging.info(
+            f"Polarity cache: {self.hits} hits, {self.misses} misses "
+            f"({self.hits / total if total else 0.0:.1%} hit rate)"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,292 @@
+"""
+Compressed embedding representations, trading a little recall for a much smaller working set.
+
+    int8        scalar quantization, 1 byte/dim (4x smaller than float32)
+    binary      sign bits, 1 bit/dim (32x smaller), searched by Hamming distance
+    truncate    Matryoshka-style first-n dims, only for models trained for it (text-embedding-3-*)
+
+Approximate scores pick rerank_factor * k candidates, which are then re-ranked against the
+float32 vectors, so only those few rows of the full matrix are ever read.
+"""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from database.exact_search import ExactSearcher, blocked_top_k, normalize_rows
+
+# Set bits per byte value, for numpy < 2.0 which has no np.bitwise_count
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return _POPCOUNT[values]
+
+
+def truncate_embeddings(embeddings: np.ndarray, dimensions: int) -> np.ndarray:
+    """
+    Keep the first `dimensions` dims of each embedding and renormalize to unit length.
+
+    Matches what the OpenAI API returns for text-embedding-3 models with the `dimensions`
+    parameter, so stored full-size embeddings can be shrunk without re-embedding.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if dimensions > embeddings.shape[-1]:
+        raise ValueError(f"Cannot truncate {embeddings.shape[-1]}-d embeddings to {dimensions} dims")
+    return normalize_rows(embeddings[..., :dimensions])
+
+
+class Quantizer(ABC):
+    """Interface shared by the quantizers, codes are scored block by block like ExactSearcher."""
+
+    mode: str
+
+    def fit(self, embeddings: np.ndarray, block_size: int = 65_536) -> "Quantizer":
+        return self
+
+    @abstractmethod
+    def encode(self, embeddings: np.ndarray) -> np.ndarray:
+        """Codes for a block of embeddings."""
+
+    @abstractmethod
+    def score(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """(Q, B) approximate similarity of unit-length queries to a block of codes, higher is closer."""
+
+    @abstractmethod
+    def bytes_per_vector(self, dim: int) -> int:
+        """Size of one vector's code."""
+
+
+class ScalarQuantizer(Quantizer):
+    """Symmetric per-dimension int8 quantization of unit-length embeddings."""
+
+    mode = "int8"
+
+    def __init__(self):
+        self.scale: Optional[np.ndarray] = None
+
+    def fit(self, embeddings: np.ndarray, block_size: int = 65_536) -> "ScalarQuantizer":
+        """Set each dimension's scale from its largest absolute value over the (normalized) corpus."""
+        max_abs = np.zeros(embeddings.shape[1], dtype=np.float32)
+        for start in range(0, len(embeddings), block_size):
+            block = normalize_rows(embeddings[start:start + block_size])
+            np.maximum(max_abs, np.abs(block).max(axis=0), out=max_abs)
+        self.scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+        return self
+
+    def encode(self, embeddings: np.ndarray) -> np.ndarray:
+        codes = np.rint(normalize_rows(embeddings) / self.scale)
+        return np.clip(codes, -127, 127).astype(np.int8)
+
+    def score(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        # Fold the scale into the query so the block is only cast, not rescaled
+        return (queries * self.scale) @ codes.astype(np.float32).T
+
+    def bytes_per_vector(self, dim: int) -> int:
+        return dim
+
+
+class BinaryQuantizer(Quantizer):
+    """Sign-bit quantization, packed 8 dims per byte and compared by Hamming distance."""
+
+    mode = "binary"
+
+    def encode(self, embeddings: np.ndarray) -> np.ndarray:
+        return np.packbits(np.asarray(embeddings) > 0, axis=1)
+
+    def score(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        query_codes = self.encode(queries)
+        scores = np.empty((len(query_codes), len(codes)), dtype=np.float32)
+        for i, query_code in enumerate(query_codes):
+            # Negated Hamming distance, so higher is closer like the other scores
+            scores[i] = -_popcount(np.bitwise_xor(codes, query_code)).sum(axis=1, dtype=np.int32)
+        return scores
+
+    def bytes_per_vector(self, dim: int) -> int:
+        return (dim + 7) // 8
+
+
+QUANTIZERS = {
+    "int8": ScalarQuantizer,
+    "binary": BinaryQuantizer,
+}
+
+
+def get_quantizer(mode: str) -> Quantizer:
+    quantizer_class = QUANTIZERS.get(mode)
+    if not quantizer_class:
+        raise ValueError(f"Unsupported quantization mode: {mode}")
+    return quantizer_class()
+
+
+class QuantizedSearcher:
+    """
+    Nearest-neighbour search over quantized codes held in memory, re-ranked with float32 vectors.
+
+    The codes (dim bytes for int8, dim / 8 for binary) are scanned in blocks like
+    ExactSearcher, and the best rerank_factor * k candidates per query are re-scored
+    exactly against `embeddings`, which may be a np.memmap left on disk.
+    """
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        mode: str = "int8",
+        rerank_factor: int = 4,
+        block_size: int = 65_536,
+    ):
+        """
+        Args:
+            embeddings: (N, dim) float matrix the codes are built from and re-ranked against.
+            mode: "int8" or "binary".
+            rerank_factor: Candidates re-ranked per result, 0 to return the approximate ranking.
+            block_size: Rows encoded and scored at a time.
+        """
+        self.quantizer = get_quantizer(mode).fit(embeddings, block_size)
+        self.rerank_factor = rerank_factor
+        self.block_size = block_size
+        self.valid = np.zeros(len(embeddings), dtype=bool)
+        codes = []
+        for start in range(0, len(embeddings), block_size):
+            block = np.asarray(embeddings[start:start + block_size], dtype=np.float32)
+            # All-zero rows (unused memmap capacity) never match
+            self.valid[start:start + len(block)] = np.any(block != 0, axis=1)
+            codes.append(self.quantizer.encode(block))
+        self.codes = np.concatenate(codes) if codes else np.empty((0, 0), dtype=np.uint8)
+        self.exact = ExactSearcher(embeddings, block_size) if rerank_factor else None
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        mask: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the (approximately) k nearest rows to each query, same return as ExactSearcher.search.
+
+        Without re-ranking, distances are 1 - the approximate cosine similarity for int8
+        and the Hamming distance for binary.
+        """
+        queries = normalize_rows(queries)
+        valid = self.valid if mask is None else self.valid & mask[:len(self.valid)]
+        candidates = k * self.rerank_factor if self.rerank_factor else k
+
+        def score_block(start: int, stop: int) -> np.ndarray:
+            scores = self.quantizer.score(queries, self.codes[start:stop])
+            scores[:, ~valid[start:stop]] = -np.inf
+            return scores
+
+        rows, scores = blocked_top_k(len(self.codes), len(queries), candidates, self.block_size, score_block)
+        if self.exact is not None:
+            return self.exact.search(queries, k, rows=rows)
+
+        missing = np.isneginf(scores)
+        if self.quantizer.mode == "binary":
+            distances = -scores
+        else:
+            distances = 1.0 - scores
+        return rows, np.where(missing, np.inf, distances)
+
+
+def _recall(found: np.ndarray, truth: np.ndarray) -> float:
+    recalls = []
+    for found_rows, truth_rows in zip(found, truth):
+        expected = set(truth_rows[truth_rows >= 0].tolist())
+        if expected:
+            recalls.append(len(expected & set(found_rows.tolist())) / len(expected))
+    return float(np.mean(recalls)) if recalls else 1.0
+
+
+def benchmark_quantization(
+    embeddings: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    rerank_factor: int = 4,
+    truncate_dims: Optional[List[int]] = None,
+) -> List[dict]:
+    """
+    Compare the size, search latency and recall@k of each compressed representation.
+
+    Recall is measured against exact float32 search over the full embeddings.
+
+    Args:
+        embeddings: (N, dim) corpus embeddings, e.g. from export_embeddings.
+        queries: (Q, dim) query embeddings, e.g. a sample of the corpus.
+        k: Neighbours per query.
+        rerank_factor: Candidates re-ranked per result for the re-ranked modes.
+        truncate_dims: Matryoshka sizes to try, e.g. [512, 256] for text-embedding-3 models.
+
+    Returns:
+        One dict per mode with bytes_per_vector, total_bytes, build_seconds, search_seconds and recall.
+    """
+    dim = embeddings.shape[1]
+    report = []
+
+    def record(mode: str, bytes_per_vector: int, build_seconds: float, search, truth=None):
+        start_time = time.time()
+        rows, _ = search()
+        search_seconds = time.time() - start_time
+        report.append({
+            "mode": mode,
+            "bytes_per_vector": bytes_per_vector,
+            "total_bytes": bytes_per_vector * len(embeddings),
+            "build_seconds": build_seconds,
+            "search_seconds": search_seconds,
+            "recall": 1.0 if truth is None else _recall(rows, truth),
+        })
+        logging.info(
+            f"{mode}: {bytes_per_vector} bytes/vector, search {search_seconds:.3f}s, "
+            f"recall@{k} {report[-1]['recall']:.3f}"
+        )
+        return rows
+
+    exact = ExactSearcher(embeddings)
+    truth = record("float32", dim * 4, 0.0, lambda: exact.search(queries, k))
+
+    for mode in QUANTIZERS:
+        for factor in (0, rerank_factor):
+            start_time = time.time()
+            searcher = QuantizedSearcher(embeddings, mode, rerank_factor=factor)
+            build_seconds = time.time() - start_time
+            name = f"{mode}+rerank{factor}" if factor else mode
+            record(name, searcher.quantizer.bytes_per_vector(dim), build_seconds,
+                   lambda: searcher.search(queries, k), truth)
+
+    for dims in truncate_dims or []:
+        if dims >= dim:
+            continue
+        start_time = time.time()
+        truncated = ExactSearcher(truncate_embeddings(embeddings, dims))
+        build_seconds = time.time() - start_time
+        truncated_queries = truncate_embeddings(queries, dims)
+        record(f"truncate{dims}", dims * 4, build_seconds,
+               lambda: truncated.search(truncated_queries, k), truth)
+
+    return report
+
+
+# Run from test_program as a module (the package imports need it on sys.path): python -m database.quantization
+if __name__ == "__main__":
+    from database.backends import get_vector_store
+
+    vec = get_vector_store()
+    _, _, corpus = vec.export_embeddings()
+    rng = np.random.default_rng(0)
+    sample = corpus[rng.choice(len(corpus), size=min(100, len(corpus)), replace=False)]
+    results = benchmark_quantization(corpus, sample, k=10, truncate_dims=[1024, 512, 256])
+
+    print(f"{'mode':<16}{'bytes/vec':>10}{'total MB':>10}{'search s':>10}{'recall@10':>11}")
+    for result in results:
+        print(
+            f"{result['mode']:<16}{result['bytes_per_vector']:>10}"
+            f"{result['total_bytes'] / 1e6:>10.1f}{result['search_seconds']:>10.3f}{result['recall']:>11.3f}"
+        )
@@ -0,0 +1,63 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+class SearchResultCache:
+    """
+    Thread-safe LRU cache with a TTL for similarity search results.
+
+    Keys include the data version current when the key was made, and callers bump the
+    version on every write. A key made before an upsert/delete never matches again, and
+    put drops results whose key is older than the current version, so results of a
+    search that overlapped a write are not cached either.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[int, str], tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, *args: Any) -> Tuple[int, str]:
+        """
+        Key for a search: the current data version and a hash of the search arguments
+        (model, query text, limit, filters, ...). Make it before running the search.
+        """
+        digest = hashlib.sha256(json.dumps(args, sort_keys=True, default=str).encode("utf-8"))
+        with self._lock:
+            return self.version, digest.hexdigest()
+
+    def get(self, key: Tuple[int, str]) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key) if key[0] == self.version else None
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple[int, str], value: Any) -> None:
+        with self._lock:
+            # The data changed while the search ran, its results may predate the write
+            if key[0] != self.version:
+                return
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Bump the data version, making every cached result stale."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
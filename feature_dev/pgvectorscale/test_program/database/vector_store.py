@@ -1,11 +1,20 @@
 import logging
 import time
-from typing import Any, List, Optional, Tuple, Union
+import uuid
+from typing import Any, Iterable, List, Optional, Tuple, Union
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
+from psycopg import sql
+from psycopg.types.json import Jsonb
 from config.settings import get_settings
-from openai import OpenAI
+from database.connection import get_pool
+from database.embedding_cache import EmbeddingCache, normalize_text
+from database.embedding_export import stream_embeddings
+from database.hybrid_search import SEARCH_MODES, exact_phrase
+from database.result_cache import SearchResultCache
+from services.embedding_factory import EmbeddingFactory
 from timescale_vector import client
 
 import os
@@ -18,10 +27,10 @@ class VectorStore:
     """A class for managing vector operations and database interactions."""
 
     def __init__(self):
-        """Initialize the VectorStore with settings, OpenAI client, and Timescale Vector client."""
+        """Initialize the VectorStore with settings, embedding provider, and Timescale Vector client."""
         self.settings = get_settings()
-        self.openai_client = OpenAI(api_key=self.settings.openai.api_key)
-        self.embedding_model = self.settings.openai.embedding_model
+        self.embedder = EmbeddingFactory().embedder
+        self.embedding_model = self.embedder.model_id
         self.vector_settings = self.settings.vector_store
         self.vec_client = client.Sync(
             self.settings.database.service_url,
@@ -29,10 +38,21 @@ class VectorStore:
             self.vector_settings.embedding_dimensions,
             time_partition_interval=self.vector_settings.time_partition_interval,
         )
+        self.embedding_cache = None
+        if self.settings.embedding_cache.enabled:
+            self.embedding_cache = EmbeddingCache(self.settings.embedding_cache.path)
+        self.last_index_build_seconds: Optional[float] = None
+        self.search_cache = None
+        if self.settings.search_cache.enabled:
+            self.search_cache = SearchResultCache(
+                maxsize=self.settings.search_cache.maxsize,
+                ttl=self.settings.search_cache.ttl_seconds,
+            )
+        self.polarity_reranker = None
 
     def get_embedding(self, text: str) -> List[float]:
         """
-        Generate embedding for the given text.
+        Generate embedding for the given text, served from the embedding cache when possible.
 
         Args:
             text: The input text to generate an embedding for.
@@ -41,31 +61,216 @@ class VectorStore:
             A list of floats representing the embedding.
         """
         text = text.replace("\n", " ")
+        if self.embedding_cache:
+            cached = self.embedding_cache.get(self.embedding_model, text)
+            if cached is not None:
+                return cached.tolist()
+
         start_time = time.time()
-        embedding = (
-            self.openai_client.embeddings.create(
-                input=[text],
-                model=self.embedding_model,
-            )
-            .data[0]
-            .embedding
-        )
+        embedding = self.embedder.embed([text])[0]
         elapsed_time = time.time() - start_time
         logging.info(f"Embedding generated in {elapsed_time:.3f} seconds")
+        if self.embedding_cache:
+            self.embedding_cache.put(self.embedding_model, text, embedding)
         return embedding
 
+    def get_embeddings(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None,
+    ) -> List[List[float]]:
+        """
+        Generate embeddings for many texts in batches.
+
+        Texts found in the embedding cache are not re-sent, and repeated texts are only
+        embedded once. The rest are handed to the embedding provider, which batches
+        them (concurrent, rate limited API calls for OpenAI, forward passes locally).
+
+        Args:
+            texts: The input texts to generate embeddings for.
+            batch_size: Max texts per batch (default: the provider's configured size).
+
+        Returns:
+            A list of embeddings in the same order as texts.
+        """
+        if not texts:
+            return []
+        texts = [text.replace("\n", " ") for text in texts]
+
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        if self.embedding_cache:
+            cached = self.embedding_cache.get_many(self.embedding_model, texts)
+            embeddings = [vector.tolist() if vector is not None else None for vector in cached]
+
+        # Group remaining positions by normalized text so duplicates share one embedding
+        pending = {}
+        for i, (text, embedding) in enumerate(zip(texts, embeddings)):
+            if embedding is None:
+                pending.setdefault(normalize_text(text), []).append(i)
+
+        if pending:
+            new_texts = [texts[positions[0]] for positions in pending.values()]
+            new_embeddings = self._embed_uncached(new_texts, batch_size)
+            for positions, embedding in zip(pending.values(), new_embeddings):
+                for i in positions:
+                    embeddings[i] = embedding
+            if self.embedding_cache:
+                self.embedding_cache.put_many(self.embedding_model, new_texts, new_embeddings)
+
+        if self.embedding_cache:
+            self.embedding_cache.log_stats()
+        return embeddings
+
+    def _embed_uncached(self, texts: List[str], batch_size: Optional[int]) -> List[List[float]]:
+        """Embed texts through the embedding provider."""
+        start_time = time.time()
+        embeddings = self.embedder.embed(texts, batch_size)
+        elapsed_time = time.time() - start_time
+        logging.info(f"{len(embeddings)} embeddings generated in {elapsed_time:.3f} seconds")
+        return embeddings
+
     def create_tables(self) -> None:
-        """Create the necessary tablesin the database"""
+        """Create the necessary tablesin the database, including the full-text column hybrid_search needs"""
         self.vec_client.create_tables()
+        self.create_text_index()
+
+    def create_index(self, **index_params) -> None:
+        """
+        Create the StreamingDiskANN index to speed up similarity search.
 
-    def create_index(self) -> None:
-        """Create the StreamingDiskANN index to spseed up similarity search"""
-        self.vec_client.create_embedding_index(client.DiskAnnIndex())
+        Args:
+            index_params: DiskAnnIndex parameters (search_list_size, num_neighbors, max_alpha,
+                storage_layout, num_bits_per_dimension) overriding settings.vector_store.diskann.
+        """
+        params = self.vector_settings.diskann.model_dump(exclude_none=True)
+        params.update(index_params)
+        start_time = time.time()
+        self.vec_client.create_embedding_index(client.DiskAnnIndex(**params))
+        self.last_index_build_seconds = time.time() - start_time
+        logging.info(
+            f"Built DiskANN index on {self.vector_settings.table_name} in "
+            f"{self.last_index_build_seconds:.3f} seconds ({params or 'default params'})"
+        )
 
     def drop_index(self) -> None:
         """Drop the StreamingDiskANN index in the database"""
         self.vec_client.drop_embedding_index()
 
+    def _binary_expression(self, column: str) -> sql.Composable:
+        """binary_quantize(column)::bit(dim), written exactly as the quantized index expression."""
+        return sql.SQL("binary_quantize({})::bit({})").format(
+            sql.SQL(column), sql.SQL(str(int(self.vector_settings.embedding_dimensions)))
+        )
+
+    def create_quantized_index(self) -> None:
+        """
+        Create a pgvector HNSW index over the binary-quantized embeddings (1 bit per dimension).
+
+        At 1536 dims the index holds 192 bytes per row instead of 6 KB, so it stays in RAM
+        when the float index does not. search and search_many use it when
+        settings.vector_store.quantization is "binary", re-ranking its candidates by exact
+        cosine distance. Needs pgvector >= 0.7.
+
+        Limits: this adds an index, it doesn't replace the float column. The float
+        embeddings stay in the table as the re-rank source (TOASTed, so only the few
+        candidate rows per query are read), and the DiskANN index stays for searches
+        with Predicates or a time_range, which don't take the binary path. The hot
+        working set only shrinks once the DiskANN index is dropped (drop_index), or
+        is built compressed instead: storage_layout="memory_optimized" with
+        num_bits_per_dimension (settings.vector_store.diskann).
+        """
+        table_name = self.vector_settings.table_name
+        start_time = time.time()
+        with get_pool().connection() as conn:
+            conn.execute(
+                sql.SQL(
+                    "CREATE INDEX IF NOT EXISTS {index} ON {table} USING hnsw (({expr}) bit_hamming_ops)"
+                ).format(
+                    index=sql.Identifier(f"{table_name}_embedding_bq_idx"),
+                    table=sql.Identifier(table_name),
+                    expr=self._binary_expression("embedding"),
+                )
+            )
+        logging.info(
+            f"Built binary quantized index on {table_name} in {time.time() - start_time:.3f} seconds"
+        )
+
+    def drop_quantized_index(self) -> None:
+        """Drop the binary quantized HNSW index."""
+        with get_pool().connection() as conn:
+            conn.execute(
+                sql.SQL("DROP INDEX IF EXISTS {}").format(
+                    sql.Identifier(f"{self.vector_settings.table_name}_embedding_bq_idx")
+                )
+            )
+
+    def _binary_search_statement(self, where: sql.Composable) -> sql.Composed:
+        """LATERAL search taking Hamming-nearest candidates from the bit index, re-ranked by <=>."""
+        return sql.SQL(
+            """
+            SELECT q.ord, r.id, r.metadata, r.contents, r.embedding, r.distance
+            FROM unnest(%s::vector[]) WITH ORDINALITY AS q(embedding, ord)
+            CROSS JOIN LATERAL (
+                SELECT c.id, c.metadata, c.contents, c.embedding, c.embedding <=> q.embedding AS distance
+                FROM (
+                    SELECT t.id, t.metadata, t.contents, t.embedding
+                    FROM {table} t
+                    {where}
+                    ORDER BY {column_bits} <~> {query_bits}
+                    LIMIT %s
+                ) c
+                ORDER BY distance
+                LIMIT %s
+            ) r
+            ORDER BY q.ord, r.distance
+            """
+        ).format(
+            table=sql.Identifier(self.vector_settings.table_name),
+            where=where,
+            column_bits=self._binary_expression("t.embedding"),
+            query_bits=self._binary_expression("q.embedding"),
+        )
+
+    def create_text_index(self) -> None:
+        """
+        Add a full-text search column (contents_tsv) and its GIN index, used by hybrid_search.
+
+        The column is generated from contents, so upsert, bulk_upsert and the timescale
+        client keep it current without any changes.
+        """
+        table_name = self.vector_settings.table_name
+        config = sql.Literal(self.vector_settings.hybrid.text_search_config)
+        start_time = time.time()
+        with get_pool().connection() as conn:
+            conn.execute(
+                sql.SQL(
+                    "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS contents_tsv tsvector "
+                    "GENERATED ALWAYS AS (to_tsvector({config}::regconfig, coalesce(contents, ''))) STORED"
+                ).format(table=sql.Identifier(table_name), config=config)
+            )
+            conn.execute(
+                sql.SQL("CREATE INDEX IF NOT EXISTS {index} ON {table} USING gin (contents_tsv)").format(
+                    index=sql.Identifier(f"{table_name}_contents_tsv_idx"),
+                    table=sql.Identifier(table_name),
+                )
+            )
+        logging.info(
+            f"Built full-text index on {table_name} in {time.time() - start_time:.3f} seconds"
+        )
+
+    @staticmethod
+    def _metadata_condition(
+        metadata_filter: Optional[Union[dict, List[dict]]], params: List[Any]
+    ) -> sql.Composable:
+        """AND clause for an equality metadata filter (dict, or list of dicts OR'd), params appended."""
+        if not metadata_filter:
+            return sql.SQL("")
+        filters = metadata_filter if isinstance(metadata_filter, list) else [metadata_filter]
+        params.extend(Jsonb(flt) for flt in filters)
+        return sql.SQL("AND ({})").format(
+            sql.SQL(" OR ").join(sql.SQL("t.metadata @> %s") for _ in filters)
+        )
+
     def upsert(self, df: pd.DataFrame) -> None:
         """
         Insert or update records in the database from a pandas DataFrame.
@@ -76,10 +281,186 @@ class VectorStore:
         """
         records = df.to_records(index=False)
         self.vec_client.upsert(list(records))
+        self._invalidate_search_cache()
         logging.info(
             f"Inserted {len(df)} records into {self.vector_settings.table_name}"
         )
 
+    def bulk_upsert(
+        self,
+        data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        chunk_size: Optional[int] = None,
+    ) -> int:
+        """
+        Insert or update records with PostgreSQL COPY, for large loads.
+
+        Rows are streamed in binary format into a temporary staging table, then merged
+        into the embeddings table with INSERT ... ON CONFLICT, one transaction per chunk
+        so memory and transaction size stay flat however much data is loaded.
+
+        Args:
+            data: A DataFrame, or an iterable of DataFrames (e.g. read in chunks), with
+                columns in upsert order: id, metadata, contents, embedding
+            chunk_size: Rows per COPY/merge transaction (default: settings.vector_store.bulk_chunk_size).
+
+        Returns:
+            The number of rows loaded.
+        """
+        chunk_size = chunk_size or self.vector_settings.bulk_chunk_size
+        if isinstance(data, pd.DataFrame):
+            data = [data]
+
+        table = sql.Identifier(self.vector_settings.table_name)
+        staging = sql.Identifier(f"{self.vector_settings.table_name}_staging")
+        copy_stmt = sql.SQL(
+            "COPY {} (id, metadata, contents, embedding) FROM STDIN WITH (FORMAT BINARY)"
+        ).format(staging)
+        merge_stmt = sql.SQL(
+            "INSERT INTO {table} (id, metadata, contents, embedding) "
+            "SELECT id, metadata, contents, embedding FROM {staging} "
+            "ON CONFLICT (id) DO UPDATE SET metadata = EXCLUDED.metadata, "
+            "contents = EXCLUDED.contents, embedding = EXCLUDED.embedding"
+        ).format(table=table, staging=staging)
+
+        start_time = time.time()
+        total = 0
+        with get_pool().connection() as conn:
+            conn.execute(
+                sql.SQL(
+                    "CREATE TEMP TABLE IF NOT EXISTS {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+                ).format(staging, table)
+            )
+            conn.commit()
+            for df in data:
+                for i in range(0, len(df), chunk_size):
+                    chunk = df.iloc[i:i + chunk_size]
+                    with conn.transaction():
+                        with conn.cursor() as cur:
+                            with cur.copy(copy_stmt) as copy:
+                                copy.set_types(["uuid", "jsonb", "text", "vector"])
+                                for id_, metadata, contents, embedding in chunk.itertuples(index=False, name=None):
+                                    # The binary uuid dumper needs a UUID, callers pass str ids
+                                    copy.write_row((
+                                        uuid.UUID(str(id_)),
+                                        Jsonb(metadata),
+                                        contents,
+                                        np.asarray(embedding, dtype=np.float32),
+                                    ))
+                            cur.execute(merge_stmt)
+                    self._invalidate_search_cache()
+                    total += len(chunk)
+                    logging.info(f"Bulk loaded {total} records into {self.vector_settings.table_name}")
+
+        elapsed_time = time.time() - start_time
+        logging.info(
+            f"Bulk upsert of {total} records completed in {elapsed_time:.3f} seconds"
+        )
+        return total
+
+    def bulk_load(
+        self,
+        data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        chunk_size: Optional[int] = None,
+        **index_params,
+    ) -> dict:
+        """
+        Load a large batch of records with the DiskANN index deferred.
+
+        Drops the index so rows don't pay index maintenance on insert, bulk upserts,
+        refreshes planner stats and rebuilds the index once at the end.
+
+        Args:
+            data: A DataFrame or iterable of DataFrames, as for bulk_upsert.
+            chunk_size: Rows per COPY/merge transaction.
+            index_params: DiskANN build parameters, as for create_index.
+
+        Returns:
+            The index_health report after the rebuild.
+        """
+        quantized = self.vector_settings.quantization == "binary"
+        self.create_tables()
+        self.drop_index()
+        if quantized:
+            self.drop_quantized_index()
+        try:
+            loaded = self.bulk_upsert(data, chunk_size=chunk_size)
+            with get_pool().connection() as conn:
+                conn.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(self.vector_settings.table_name)))
+        finally:
+            # Always put the index back, a failed load shouldn't leave search unindexed
+            self.create_index(**index_params)
+            if quantized:
+                self.create_quantized_index()
+        report = self.index_health()
+        logging.info(f"Bulk load of {loaded} records finished: {report}")
+        return report
+
+    def index_health(self) -> dict:
+        """
+        Report on the embeddings table and its DiskANN index.
+
+        Returns:
+            A dict with row_count, index_name, indexed_rows (planner estimate of index
+            tuples, None if no index), index_size_bytes, table_size_bytes and
+            last_build_seconds (None if not built by this VectorStore).
+        """
+        table_name = self.vector_settings.table_name
+        with get_pool().connection() as conn:
+            row_count = conn.execute(
+                sql.SQL("SELECT count(*) FROM {}").format(sql.Identifier(table_name))
+            ).fetchone()[0]
+            table_size = conn.execute(
+                "SELECT pg_total_relation_size(%s::regclass)", (table_name,)
+            ).fetchone()[0]
+            index_row = conn.execute(
+                """
+                SELECT c.relname, c.reltuples::bigint, pg_relation_size(c.oid)
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                JOIN pg_am am ON am.oid = c.relam
+                WHERE i.indrelid = %s::regclass AND am.amname = 'diskann'
+                """,
+                (table_name,),
+            ).fetchone()
+
+        index_name, indexed_rows, index_size = index_row if index_row else (None, None, None)
+        return {
+            "row_count": row_count,
+            "index_name": index_name,
+            "indexed_rows": indexed_rows,
+            "index_size_bytes": index_size,
+            "table_size_bytes": table_size,
+            "last_build_seconds": self.last_index_build_seconds,
+        }
+
+    def export_embeddings(
+        self,
+        memmap_path: Optional[Union[str, Path]] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Tuple[List[str], List[str], np.ndarray]:
+        """
+        Load every stored record's id, contents and embedding.
+
+        Rows are streamed through a server-side cursor into a preallocated matrix
+        (see stream_embeddings), not materialized as Python lists first.
+
+        Args:
+            memmap_path: Write the embeddings to this .npy file instead of RAM.
+            chunk_size: Rows fetched per round trip (default: settings.vector_store.bulk_chunk_size).
+
+        Returns:
+            (ids, contents, embeddings) with embeddings as an (N, dim) float32 matrix.
+        """
+        query = sql.SQL("SELECT id, contents, embedding FROM {}").format(
+            sql.Identifier(self.vector_settings.table_name)
+        )
+        return stream_embeddings(
+            query,
+            self.vector_settings.embedding_dimensions,
+            memmap_path=memmap_path,
+            chunk_size=chunk_size or self.vector_settings.bulk_chunk_size,
+        )
+
     def search(
         self,
         query_text: str,
@@ -88,6 +469,8 @@ class VectorStore:
         predicates: Optional[client.Predicates] = None,
         time_range: Optional[Tuple[datetime, datetime]] = None,
         return_dataframe: bool = True,
+        columns: Optional[List[str]] = None,
+        include_embedding: bool = True,
     ) -> Union[List[Tuple[Any, ...]], pd.DataFrame]:
         """
         Query the vector database for similar embeddings based on input text.
@@ -106,6 +489,9 @@ class VectorStore:
                 - | is used to combine multiple predicates with OR operator.
             time_range: A tuple of (start_date, end_date) to filter results by time.
             return_dataframe: Whether to return results as a DataFrame (default: True).
+            columns: Only return these columns (any of id, content, embedding, distance or a
+                metadata key), in this order. Applies to both DataFrame and tuple results.
+            include_embedding: Whether to keep the embedding vector in the results (default: True).
 
         Returns:
             Either a list of tuples or a pandas DataFrame containing the search results.
@@ -128,10 +514,32 @@ class VectorStore:
             Search with time range:
                 vector_store.search("Recent updates", time_range=(datetime(2024, 1, 1), datetime(2024, 1, 31)))
         """
-        query_embedding = self.get_embedding(query_text)
-
         start_time = time.time()
 
+        # Predicates and time ranges need the timescale client's float search
+        if self.vector_settings.quantization == "binary" and predicates is None and time_range is None:
+            return self.search_many(
+                [query_text], limit=limit, metadata_filter=metadata_filter,
+                return_dataframe=return_dataframe, columns=columns, include_embedding=include_embedding,
+            )[0]
+
+        # Predicates objects have no stable key, those searches always go to the database.
+        # Looked up by text before embedding, so a hit costs no embedding call
+        cache_key = None
+        if self.search_cache and predicates is None:
+            cache_key = self.search_cache.make_key(
+                "search", self.embedding_model, normalize_text(query_text), limit, metadata_filter, time_range
+            )
+            results = self.search_cache.get(cache_key)
+            if results is not None:
+                logging.info(
+                    f"Vector search served from cache in {time.time() - start_time:.6f} seconds"
+                )
+                if return_dataframe:
+                    return self._create_dataframe_from_results(results, columns, include_embedding)
+                return self._project_results(results, columns, include_embedding)
+
+        query_embedding = self.get_embedding(query_text)
         search_args = {
             "limit": limit,
         }
@@ -147,43 +555,402 @@ class VectorStore:
             search_args["uuid_time_filter"] = client.UUIDTimeRange(start_date, end_date)
 
         results = self.vec_client.search(query_embedding, **search_args)
+        if cache_key:
+            self.search_cache.put(cache_key, results)
         elapsed_time = time.time() - start_time
 
         logging.info(f"Vector search completed in {elapsed_time:.3f} seconds")
 
         if return_dataframe:
-            return self._create_dataframe_from_results(results)
+            return self._create_dataframe_from_results(results, columns, include_embedding)
+        else:
+            return self._project_results(results, columns, include_embedding)
+
+    def search_many(
+        self,
+        queries: Union[List[str], List[List[float]], np.ndarray],
+        limit: int = 5,
+        metadata_filter: Union[dict, List[dict]] = None,
+        return_dataframe: bool = True,
+        query_batch_size: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+        include_embedding: bool = True,
+    ) -> Union[List[List[Tuple[Any, ...]]], List[pd.DataFrame]]:
+        """
+        Run many similarity searches at once, e.g. nearest-neighbour sweeps over claims.
+
+        Texts are embedded with get_embeddings (batched and cached). Each batch of query
+        vectors is searched with a single LATERAL join query over one connection, which
+        still lets every per-query subquery use the DiskANN index. With
+        settings.vector_store.quantization = "binary", candidates come from the bit-quantized
+        index (see create_quantized_index) and are re-ranked by full-precision distance.
+
+        Args:
+            queries: Query texts, or precomputed query embeddings.
+            limit: The maximum number of results to return per query.
+            metadata_filter: A dictionary or list of dictionaries for equality-based (jsonb containment) metadata filtering.
+            return_dataframe: Whether to return each query's results as a DataFrame (default: True).
+            query_batch_size: Queries per SQL statement (default: settings.vector_store.search_batch_size).
+            columns: Only return these columns, as for search.
+            include_embedding: Whether to keep the embedding vector in the results, as for search.
+
+        Returns:
+            A list aligned with queries, each entry holding that query's results in the same
+            form search returns (tuples of id, metadata, contents, embedding, distance, or a DataFrame).
+        """
+        if len(queries) == 0:
+            return []
+        if isinstance(queries[0], str):
+            embeddings = self.get_embeddings(list(queries))
+        else:
+            embeddings = queries
+        query_batch_size = query_batch_size or self.vector_settings.search_batch_size
+
+        params: List[Any] = []
+        where = sql.SQL("WHERE TRUE {}").format(self._metadata_condition(metadata_filter, params))
+        quantized = self.vector_settings.quantization == "binary"
+        if quantized:
+            candidates = limit * self.vector_settings.rerank_factor
+            stmt = self._binary_search_statement(where)
+            params.extend([candidates, limit])
         else:
-            return results
+            stmt = sql.SQL(
+                """
+                SELECT q.ord, r.id, r.metadata, r.contents, r.embedding, r.distance
+                FROM unnest(%s::vector[]) WITH ORDINALITY AS q(embedding, ord)
+                CROSS JOIN LATERAL (
+                    SELECT t.id, t.metadata, t.contents, t.embedding, t.embedding <=> q.embedding AS distance
+                    FROM {table} t
+                    {where}
+                    ORDER BY t.embedding <=> q.embedding
+                    LIMIT %s
+                ) r
+                ORDER BY q.ord, r.distance
+                """
+            ).format(table=sql.Identifier(self.vector_settings.table_name), where=where)
+            params.append(limit)
+
+        start_time = time.time()
+        grouped: List[List[Tuple[Any, ...]]] = [[] for _ in range(len(embeddings))]
+        with get_pool().connection() as conn:
+            if quantized:
+                # The HNSW scan stops at ef_search rows, let it produce every candidate
+                conn.execute(
+                    "SELECT set_config('hnsw.ef_search', %s, true)", (str(max(40, candidates)),)
+                )
+            for offset in range(0, len(embeddings), query_batch_size):
+                batch = [
+                    np.asarray(embedding, dtype=np.float32)
+                    for embedding in embeddings[offset:offset + query_batch_size]
+                ]
+                rows = conn.execute(stmt, [batch, *params]).fetchall()
+                for ord_, *result in rows:
+                    grouped[offset + ord_ - 1].append(tuple(result))
+        elapsed_time = time.time() - start_time
+        logging.info(
+            f"Vector search for {len(embeddings)} queries completed in {elapsed_time:.3f} seconds"
+        )
+
+        if return_dataframe:
+            return [
+                self._create_dataframe_from_results(results, columns, include_embedding)
+                for results in grouped
+            ]
+        return [self._project_results(results, columns, include_embedding) for results in grouped]
+
+    def hybrid_search(
+        self,
+        query_text: str,
+        limit: int = 5,
+        metadata_filter: Union[dict, List[dict]] = None,
+        mode: str = "auto",
+        return_dataframe: bool = True,
+        columns: Optional[List[str]] = None,
+        include_embedding: bool = True,
+    ) -> Union[List[Tuple[Any, ...]], pd.DataFrame]:
+        """
+        Search with full-text and vector similarity combined by reciprocal-rank fusion.
+
+        Embeddings match meaning but blur exact names and negations, the full-text index
+        (create_text_index) matches the words themselves. Each side ranks its top
+        settings.vector_store.hybrid.candidates rows, and rows are ordered by
+        sum(1 / (rrf_k + rank)), all in one statement. The metadata filter is applied
+        inside both rankings, before anything is scored.
+
+        Args:
+            query_text: The input text to search for.
+            limit: The maximum number of results to return.
+            metadata_filter: A dictionary or list of dictionaries for equality-based metadata filtering.
+            mode: "hybrid" fuses both rankings. "lexical" runs only the full-text
+                phrase match, with no embedding call. "auto" (default) is lexical for
+                exact-name queries (quoted, or short and capitalized like "Tren de
+                Aragua") that have matches, hybrid otherwise.
+            return_dataframe: Whether to return results as a DataFrame (default: True).
+            columns: Only return these columns, as for search.
+            include_embedding: Whether to keep the embedding vector in the results, as for search.
+
+        Returns:
+            Results in the same form as search. Lexical results have a distance of None.
+
+        Examples:
+            vector_store.hybrid_search("Tren de Aragua")
+            vector_store.hybrid_search("Who is against deporting illegal immigrants", limit=10)
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unsupported search mode: {mode} (expected one of {SEARCH_MODES})")
+        hybrid_settings = self.vector_settings.hybrid
+
+        phrase = None
+        if mode == "lexical":
+            phrase = query_text
+        elif mode == "auto":
+            phrase = exact_phrase(query_text, hybrid_settings.exact_max_terms)
+
+        results = None
+        if phrase is not None:
+            results = self._cached_search(
+                ("lexical", phrase, limit, metadata_filter),
+                lambda: self._lexical_search(phrase, limit, metadata_filter),
+            )
+            # A name with no matches might still be worded differently, fall through
+            if not results and mode == "auto":
+                results = None
+        if results is None:
+            results = self._cached_search(
+                ("hybrid", query_text, limit, metadata_filter),
+                lambda: self._fused_search(
+                    query_text, self.get_embedding(query_text), limit, metadata_filter
+                ),
+            )
+
+        if return_dataframe:
+            return self._create_dataframe_from_results(results, columns, include_embedding)
+        return self._project_results(results, columns, include_embedding)
+
+    def _cached_search(self, key_args: tuple, run) -> List[Tuple[Any, ...]]:
+        """Serve a search from search_cache, or run it (embedding included) and cache the results."""
+        cache_key = None
+        if self.search_cache:
+            cache_key = self.search_cache.make_key(self.embedding_model, *key_args)
+            results = self.search_cache.get(cache_key)
+            if results is not None:
+                return results
+        start_time = time.time()
+        results = run()
+        logging.info(f"{key_args[0].capitalize()} search completed in {time.time() - start_time:.3f} seconds")
+        if cache_key:
+            self.search_cache.put(cache_key, results)
+        return results
+
+    def _lexical_search(
+        self, phrase: str, limit: int, metadata_filter: Optional[Union[dict, List[dict]]]
+    ) -> List[Tuple[Any, ...]]:
+        """Rows containing phrase, best ts_rank_cd first, served by the GIN index."""
+        params: List[Any] = [self.vector_settings.hybrid.text_search_config, phrase]
+        condition = self._metadata_condition(metadata_filter, params)
+        params.append(limit)
+        stmt = sql.SQL(
+            """
+            SELECT t.id, t.metadata, t.contents, t.embedding, NULL::float8 AS distance
+            FROM {table} t, phraseto_tsquery(%s::regconfig, %s) AS q(query)
+            WHERE t.contents_tsv @@ q.query {condition}
+            ORDER BY ts_rank_cd(t.contents_tsv, q.query) DESC
+            LIMIT %s
+            """
+        ).format(table=sql.Identifier(self.vector_settings.table_name), condition=condition)
+        with get_pool().connection() as conn:
+            return [tuple(row) for row in conn.execute(stmt, params).fetchall()]
+
+    def _fused_search(
+        self,
+        query_text: str,
+        query_embedding: List[float],
+        limit: int,
+        metadata_filter: Optional[Union[dict, List[dict]]],
+    ) -> List[Tuple[Any, ...]]:
+        """Full-text and vector top candidates fused by reciprocal rank, in one statement."""
+        hybrid_settings = self.vector_settings.hybrid
+        candidates = max(limit, hybrid_settings.candidates)
+        embedding = np.asarray(query_embedding, dtype=np.float32)
+
+        # Words OR'd instead of plainto_tsquery's AND, questions rarely contain every word
+        params: List[Any] = [hybrid_settings.text_search_config, query_text]
+        lexical_condition = self._metadata_condition(metadata_filter, params)
+        params.extend([candidates, embedding])
+        vector_condition = self._metadata_condition(metadata_filter, params)
+        params.extend([embedding, candidates, hybrid_settings.rrf_k, embedding, limit])
+
+        stmt = sql.SQL(
+            """
+            WITH lexical AS (
+                SELECT id, row_number() OVER (ORDER BY score DESC) AS rank
+                FROM (
+                    SELECT t.id, ts_rank_cd(t.contents_tsv, q.query) AS score
+                    FROM {table} t,
+                        replace(plainto_tsquery(%s::regconfig, %s)::text, '&', '|')::tsquery AS q(query)
+                    WHERE t.contents_tsv @@ q.query {lexical_condition}
+                    ORDER BY score DESC
+                    LIMIT %s
+                ) l
+            ),
+            semantic AS (
+                SELECT id, row_number() OVER (ORDER BY distance) AS rank
+                FROM (
+                    SELECT t.id, t.embedding <=> %s::vector AS distance
+                    FROM {table} t
+                    WHERE TRUE {vector_condition}
+                    ORDER BY t.embedding <=> %s::vector
+                    LIMIT %s
+                ) v
+            ),
+            fused AS (
+                SELECT id, sum(1.0 / (%s + rank)) AS score
+                FROM (SELECT id, rank FROM lexical UNION ALL SELECT id, rank FROM semantic) ranks
+                GROUP BY id
+            )
+            SELECT t.id, t.metadata, t.contents, t.embedding, t.embedding <=> %s::vector AS distance
+            FROM fused f
+            JOIN {table} t ON t.id = f.id
+            ORDER BY f.score DESC
+            LIMIT %s
+            """
+        ).format(
+            table=sql.Identifier(self.vector_settings.table_name),
+            lexical_condition=lexical_condition,
+            vector_condition=vector_condition,
+        )
+        with get_pool().connection() as conn:
+            return [tuple(row) for row in conn.execute(stmt, params).fetchall()]
+
+    def polarity_search(
+        self,
+        query_text: str,
+        limit: int = 5,
+        stance: Optional[str] = None,
+        metadata_filter: Union[dict, List[dict]] = None,
+        hybrid: bool = False,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Search for claims and label each hit as entailing, contradicting or neutral to the query claim.
+
+        limit * settings.polarity.candidate_factor hits are fetched (search, or
+        hybrid_search with hybrid=True) and classified by the local NLI re-ranker
+        (services.polarity_ranker.PolarityReranker), batched and cached.
+
+        Args:
+            query_text: The query claim.
+            limit: The maximum number of results to return.
+            stance: "entail" keeps claims supporting the query, "contradict" claims
+                refuting it, best first. None labels the top hits in search order.
+            metadata_filter: A dictionary or list of dictionaries for equality-based metadata filtering.
+            hybrid: Fetch candidates with hybrid_search instead of search.
+            columns: Only return these columns (plus the polarity columns), as for search.
+
+        Returns:
+            A DataFrame of results with polarity, entail, contradict and neutral columns.
+
+        Examples:
+            vector_store.polarity_search("Biden opened the border", stance="contradict")
+        """
+        from services.polarity_ranker import LABELS, PolarityReranker
+
+        # Before the embedding call and the search, not after them in rerank
+        if stance is not None and stance not in LABELS:
+            raise ValueError(f"Unsupported stance: {stance} (expected one of {LABELS})")
+        if self.polarity_reranker is None:
+            self.polarity_reranker = PolarityReranker(self.settings.polarity)
+
+        candidates = limit if stance is None else limit * self.settings.polarity.candidate_factor
+        if columns is not None and "content" not in columns:
+            columns = [*columns, "content"]
+        search = self.hybrid_search if hybrid else self.search
+        results = search(
+            query_text, limit=candidates, metadata_filter=metadata_filter,
+            columns=columns, include_embedding=False,
+        )
+        df = self.polarity_reranker.rerank(query_text, results, stance=stance)
+        if stance is not None:
+            df = df[df["polarity"] == stance]
+        return df.head(limit).reset_index(drop=True)
 
     def _create_dataframe_from_results(
         self,
         results: List[Tuple[Any, ...]],
+        columns: Optional[List[str]] = None,
+        include_embedding: bool = True,
     ) -> pd.DataFrame:
         """
         Create a pandas DataFrame from the search results.
 
         Args:
             results: A list of tuples containing the search results.
+            columns: Only build these columns (see search), in this order.
+            include_embedding: Whether to include the embedding column.
 
         Returns:
             A pandas DataFrame containing the formatted search results.
         """
-        # Convert results to DataFrame
-        df = pd.DataFrame(
-            results, columns=["id", "metadata", "content", "embedding", "distance"]
-        )
-
-        # Expand metadata column
-        df = pd.concat(
-            [df.drop(["metadata"], axis=1), df["metadata"].apply(pd.Series)], axis=1
+        ids, metadata, contents, embeddings, distances = (
+            zip(*results) if results else ((), (), (), (), ())
         )
-
         # Convert id to string for better readability
-        df["id"] = df["id"].astype(str)
-
+        data = {
+            "id": [str(id_) for id_ in ids],
+            "content": contents,
+            "embedding": embeddings,
+            "distance": distances,
+        }
+        if not include_embedding:
+            del data["embedding"]
+        if columns is not None:
+            # The metadata dict itself, as _project_results returns it, only when asked for
+            if "metadata" in columns:
+                data["metadata"] = list(metadata)
+            data = {name: data[name] for name in data if name in columns}
+        df = pd.DataFrame(data)
+
+        # Expand metadata column, one vectorized pass instead of a Series per row
+        wanted_meta = None if columns is None else [name for name in columns if name not in data]
+        if wanted_meta is None or wanted_meta:
+            meta_df = pd.json_normalize([meta or {} for meta in metadata], max_level=0)
+            if wanted_meta:
+                meta_df = meta_df.reindex(columns=wanted_meta)
+            df = pd.concat([df, meta_df], axis=1)
+
+        if columns is not None:
+            df = df[[name for name in columns if name in df.columns]]
         return df
 
+    @staticmethod
+    def _project_results(
+        results: List[Tuple[Any, ...]],
+        columns: Optional[List[str]] = None,
+        include_embedding: bool = True,
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Apply column projection to raw search result tuples without building a DataFrame.
+
+        With no projection the results are returned untouched. Otherwise each tuple holds the
+        requested columns in order, metadata keys looked up in the row's metadata.
+        """
+        if columns is None:
+            if include_embedding:
+                return results
+            return [(id_, meta, content, distance) for id_, meta, content, _, distance in results]
+
+        positions = {"id": 0, "metadata": 1, "content": 2, "embedding": 3, "distance": 4}
+        if not include_embedding:
+            columns = [name for name in columns if name != "embedding"]
+        projected = []
+        for row in results:
+            meta = row[1] or {}
+            projected.append(tuple(
+                row[positions[name]] if name in positions else meta.get(name)
+                for name in columns
+            ))
+        return projected
+
     def delete(
         self,
         ids: List[str] = None,
@@ -227,4 +994,10 @@ class VectorStore:
             self.vec_client.delete_by_metadata(metadata_filter)
             logging.info(
                 f"Deleted records matching metadata filter from {self.vector_settings.table_name}"
-            )
\ No newline at end of file
+            )
+        self._invalidate_search_cache()
+
+    def _invalidate_search_cache(self) -> None:
+        """Drop cached search results after the table changes."""
+        if self.search_cache:
+            self.search_cache.invalidate()
\ No newline at end of file
@@ -0,0 +1,253 @@
+"""
+Entity resolution for speakers and organizations.
+
+DataGrabber ids entities by an MD5 of "name title", so "Sen. Jane Doe", "Senator Jane
+Doe" and "Jane Doe" (with another title) become three entities. EntityResolver maps
+each of them to one canonical entity id:
+
+    blocking    candidates share a normalized name or a surname phonetic key
+    scoring     string similarity of normalized names, entity types must agree
+    aliases     every resolved entity id is saved (SQLite), so reruns and new
+                articles resolve known entities with a single lookup
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import List, Optional, Set, Tuple, Union
+
+from config.settings import get_settings
+
+# Honorifics and office titles dropped from the front of names
+NAME_PREFIXES = {
+    "mr", "mrs", "ms", "miss", "dr", "prof", "sen", "senator", "rep", "representative",
+    "congressman", "congresswoman", "gov", "governor", "pres", "president", "vice",
+    "vp", "mayor", "judge", "justice", "gen", "general", "secretary", "sec", "speaker",
+    "leader", "rev", "hon", "the",
+}
+# Credentials are dropped, generational suffixes are kept: "Donald Trump Jr." is not "Donald Trump"
+NAME_SUFFIXES = {"phd", "md", "esq"}
+GENERATIONAL_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"), **dict.fromkeys("cgjkqsxz", "2"), **dict.fromkeys("dt", "3"),
+    "l": "4", **dict.fromkeys("mn", "5"), "r": "6",
+}
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents, punctuation, honorifics and credentials: "Sen. José Doe Jr., PhD" -> "jose doe jr"."""
+    name = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii")
+    tokens = re.sub(r"[^a-z0-9\s]", " ", name.lower()).split()
+    while len(tokens) > 1 and tokens[0] in NAME_PREFIXES:
+        tokens = tokens[1:]
+    while len(tokens) > 1 and tokens[-1] in NAME_SUFFIXES:
+        tokens = tokens[:-1]
+    return " ".join(tokens)
+
+
+def split_suffix(tokens: List[str]) -> Tuple[List[str], str]:
+    """Name tokens without a trailing generational suffix, and that suffix ("" for none)."""
+    if len(tokens) > 1 and tokens[-1] in GENERATIONAL_SUFFIXES:
+        return tokens[:-1], tokens[-1]
+    return tokens, ""
+
+
+def _given_names_match(given_a: List[str], given_b: List[str]) -> bool:
+    """Same given names and initials, allowing an initial for a name and small spelling slips."""
+    if len(given_a) != len(given_b):
+        return False
+    for x, y in zip(given_a, given_b):
+        if x == y or (len(x) == 1 and y.startswith(x)) or (len(y) == 1 and x.startswith(y)):
+            continue
+        if len(x) == 1 or len(y) == 1 or SequenceMatcher(None, x, y).ratio() < 0.85:
+            return False
+    return True
+
+
+def soundex(word: str) -> str:
+    """American Soundex code of a word ("robert" -> "r163"), "" for no letters."""
+    letters = [c for c in word.lower() if c.isalpha()]
+    if not letters:
+        return ""
+    code = letters[0]
+    last = SOUNDEX_CODES.get(letters[0], "")
+    for c in letters[1:]:
+        digit = SOUNDEX_CODES.get(c, "")
+        if digit and digit != last:
+            code += digit
+        # h and w don't separate letters with the same code, vowels do
+        if c not in "hw":
+            last = digit
+    return (code + "000")[:4]
+
+
+def blocking_keys(normalized: str) -> Set[str]:
+    """Keys an entity is filed under, candidates for a match share at least one key."""
+    if not normalized:
+        return set()
+    keys = {f"n:{normalized}"}
+    tokens, _ = split_suffix(normalized.split())
+    # Surname sound-alike, catches "Jon Doe" / "John Doe" and "Doe" / "Jane Doe"
+    keys.add(f"p:{soundex(tokens[-1])}")
+    if len(tokens) > 1:
+        # Acronym, catches "Federal Bureau of Investigation" / "FBI"
+        keys.add(f"a:{''.join(token[0] for token in tokens if token not in ('of', 'and', 'for'))}")
+    else:
+        keys.add(f"a:{tokens[0]}")
+    return keys
+
+
+def name_similarity(a: str, b: str) -> float:
+    """Similarity in [0, 1] of two normalized names."""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    tokens_a, suffix_a = split_suffix(a.split())
+    tokens_b, suffix_b = split_suffix(b.split())
+    # "Jr." / "Sr." / "III" are different people
+    if suffix_a != suffix_b:
+        return 0.0
+    score = SequenceMatcher(None, a, b).ratio()
+    if tokens_a[-1] == tokens_b[-1]:
+        given_a, given_b = tokens_a[:-1], tokens_b[:-1]
+        # Bare surname, titles are already stripped ("doe" / "sen. doe" / "jane doe")
+        if not given_a or not given_b:
+            score = max(score, 0.9)
+        # Initials ("j doe" / "jane doe")
+        elif _given_names_match(given_a, given_b):
+            score = max(score, 0.9)
+        # Both have given names that disagree ("george w bush" / "george h w bush")
+        else:
+            score = min(score, 0.5)
+    # Acronym of the other name ("fbi" / "federal bureau of investigation")
+    for short, long_tokens in ((" ".join(tokens_a), tokens_b), (" ".join(tokens_b), tokens_a)):
+        if " " not in short and len(long_tokens) > 1:
+            acronym = "".join(token[0] for token in long_tokens if token not in ("of", "and", "for"))
+            if short == acronym:
+                score = max(score, 0.9)
+    return score
+
+
+class EntityResolver:
+    """
+    Assigns canonical entity ids, persisting aliases and blocking keys in SQLite.
+
+    A new entity joins the best scoring candidate (same type, score >= threshold) as
+    long as no other candidate scores as well, otherwise it becomes a canonical entity
+    itself under its own id.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, threshold: Optional[float] = None):
+        """
+        Args:
+            path: SQLite file for the alias table (default: settings.entity_resolution.path).
+            threshold: Minimum name similarity for a match (default: settings.entity_resolution.threshold).
+        """
+        resolution_settings = get_settings().entity_resolution
+        self.path = Path(path or resolution_settings.path)
+        self.threshold = threshold or resolution_settings.threshold
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entities (
+                canonical_id TEXT PRIMARY KEY, name TEXT, normalized TEXT, type TEXT, title TEXT
+            );
+            CREATE TABLE IF NOT EXISTS aliases (
+                entity_id TEXT PRIMARY KEY, canonical_id TEXT NOT NULL, name TEXT, title TEXT, score REAL
+            );
+            CREATE TABLE IF NOT EXISTS blocks (
+                key TEXT NOT NULL, canonical_id TEXT NOT NULL, PRIMARY KEY (key, canonical_id)
+            );
+            """
+        )
+        self._conn.commit()
+        self.merged = 0
+
+    def _candidates(self, keys: Set[str]) -> List[Tuple[str, str, str]]:
+        keys = list(keys)
+        return self._conn.execute(
+            f"""
+            SELECT DISTINCT e.canonical_id, e.normalized, e.type
+            FROM blocks b JOIN entities e ON e.canonical_id = b.canonical_id
+            WHERE b.key IN ({','.join('?' * len(keys))})
+            """,
+            keys,
+        ).fetchall()
+
+    def resolve(self, entity: dict) -> str:
+        """
+        Canonical id for an extracted entity (with its DataGrabber id, name, type, title).
+
+        Args:
+            entity: Entity dict; entity["id"] is its own (name + title hash) id.
+
+        Returns:
+            The canonical entity id, entity["id"] itself if it is new and unmatched.
+        """
+        entity_id = entity["id"]
+        with self._lock:
+            known = self._conn.execute(
+                "SELECT canonical_id FROM aliases WHERE entity_id = ?", (entity_id,)
+            ).fetchone()
+            if known:
+                return known[0]
+
+            normalized = normalize_name(entity.get("name", ""))
+            entity_type = (entity.get("type") or "").lower()
+            keys = blocking_keys(normalized)
+
+            scored = []
+            for canonical_id, candidate, candidate_type in self._candidates(keys) if keys else []:
+                if entity_type and candidate_type and entity_type != candidate_type:
+                    continue
+                scored.append((name_similarity(normalized, candidate), canonical_id))
+            scored.sort(reverse=True)
+
+            canonical_id, score = entity_id, 1.0
+            if scored and scored[0][0] >= self.threshold:
+                # Ambiguous, e.g. "Doe" with both "Jane Doe" and "John Doe" known
+                if len(scored) == 1 or scored[1][0] < scored[0][0]:
+                    score, canonical_id = scored[0]
+                    self.merged += 1
+
+            if canonical_id == entity_id:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO entities (canonical_id, name, normalized, type, title) VALUES (?, ?, ?, ?, ?)",
+                    (entity_id, entity.get("name"), normalized, entity_type, entity.get("title")),
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO blocks (key, canonical_id) VALUES (?, ?)",
+                    [(key, entity_id) for key in keys],
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO aliases (entity_id, canonical_id, name, title, score) VALUES (?, ?, ?, ?, ?)",
+                (entity_id, canonical_id, entity.get("name"), entity.get("title"), score),
+            )
+            self._conn.commit()
+        return canonical_id
+
+    def aliases(self, canonical_id: str) -> List[Tuple[str, str]]:
+        """(name, title) of every entity resolved to canonical_id."""
+        return self._conn.execute(
+            "SELECT name, title FROM aliases WHERE canonical_id = ?", (canonical_id,)
+        ).fetchall()
+
+    def log_stats(self) -> None:
+        canonical = self._conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+        aliases = self._conn.execute("SELECT COUNT(*) FROM aliases").fetchone()[0]
+        logging.info(
+            f"Entity resolution: {aliases} entity ids -> {canonical} canonical entities "
+            f"({self.merged} merged this run)"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -33,7 +33,6 @@ def prepare_record(row):
         This is useful when your content already has an associated datetime.
     """
     content = f"Question: {row['question']}\nAnswer: {row['answer']}"
-    embedding = vec.get_embedding(content)
     return pd.Series(
         {
             "id": str(uuid_from_time(datetime.now())),
@@ -42,14 +41,14 @@ def prepare_record(row):
                 "created_at": datetime.now().isoformat(),
             },
             "contents": content,
-            "embedding": embedding,
         }
     )
 
 
 records_df = df.apply(prepare_record, axis=1)
+# Embed all rows in batched API calls rather than one call per row
+records_df["embedding"] = vec.get_embeddings(records_df["contents"].tolist())
 
-# Create tables and insert data
-vec.create_tables()
-vec.create_index()  # DiskAnnIndex
-vec.upsert(records_df)
+# Create tables and insert data, building the DiskAnnIndex after the load
+report = vec.bulk_load(records_df)
+print(report)
@@ -3,6 +3,8 @@ import json
 import os
 from pathlib import Path
 
+from records import ClaimStore
+
 PROJ_ROOT = Path(os.environ["PROJ_ROOT"])
 data_dir = PROJ_ROOT / "data"
 
@@ -16,7 +18,7 @@ class DataGrabber:
         return hashlib.md5(text.encode('utf-8')).hexdigest()
     
 
-    def extract_data_from_fjson(self, data_dir=data_dir, save_json=False):
+    def extract_data_from_fjson(self, data_dir=data_dir, save_json=False, merge_canonical=False, resolve_entities=False):
         json_flist = []
         for filename in os.listdir(data_dir):
             if filename.lower().endswith('.json'):
@@ -31,6 +33,12 @@ class DataGrabber:
         claims_by_id = {}
         canonical_by_id = {}
 
+        # Maps name variants of the same speaker/org to one entity id, see entity_resolution.py
+        resolver = None
+        if resolve_entities:
+            from entity_resolution import EntityResolver
+            resolver = EntityResolver()
+
         # Grab data from files
         for file in json_flist:
             with open(file, "r") as f:
@@ -68,6 +76,9 @@ class DataGrabber:
                     entity['uname'] = entity["name"]
                 new_id = self.generate_id(entity['uname'])
                 entity['id'] = new_id
+                if resolver:
+                    new_id = resolver.resolve(entity)
+                    entity['id'] = new_id
                 local_entity_id_to_hash[orig_id] = new_id
                 if new_id not in entities_by_id.keys():
                     entities_by_id[new_id] = entity
@@ -121,7 +132,11 @@ class DataGrabber:
                 except KeyError as e:
                     print(f"{e}. Malformed dict for file: {data.get('filename')}")
 
-                canonical_by_id[new_id] = cc
+                # Same canonical text in another article hashes to the same id, keep both articles' claims
+                existing = canonical_by_id.setdefault(cc['id'], cc)
+                if existing is not cc:
+                    for name in ('supporting_claims', 'refuting_claims', 'uncertain_claims'):
+                        existing[name] = list(dict.fromkeys(existing.get(name, []) + cc.get(name, [])))
 
         result_json = {
             "canonical_claims": canonical_by_id,
@@ -131,11 +146,32 @@ class DataGrabber:
             "entities": entities_by_id
         }
 
+        if resolver:
+            resolver.log_stats()
+            resolver.close()
+
+        if merge_canonical:
+            # Needs embeddings, so only imported when asked for
+            from canon_merge import merge_canonical_claims
+            result_json = merge_canonical_claims(result_json)
+
         if save_json:
             with open("./outputs/canon_claim.json", "w+") as data_file:
                 json.dump(result_json, data_file, indent=2)
 
         return result_json
+
+
+    def extract_records(self, data_dir=data_dir, parquet_dir=None, merge_canonical=False, resolve_entities=False):
+        """Same as extract_data_from_fjson, but returns a typed ClaimStore (optionally saved as parquet)."""
+        store = ClaimStore.from_grabbed(
+            self.extract_data_from_fjson(
+                data_dir=data_dir, merge_canonical=merge_canonical, resolve_entities=resolve_entities
+            )
+        )
+        if parquet_dir:
+            store.write_parquet(parquet_dir)
+        return store
     
 
 if __name__ == "__main__":
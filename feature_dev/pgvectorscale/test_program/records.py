@@ -0,0 +1,208 @@
+import sys
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Dict, List, Optional, Type
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+# Columns with few distinct values (claim type, category, article link/file).
+# Interned in memory and dictionary encoded on disk so each value is stored once.
+LOW_CARDINALITY = {"type", "category", "link", "file", "date", "location"}
+
+
+def _intern(value):
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+class Record:
+    """Mixin for the slotted record types, handles dict/Arrow conversion."""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Record":
+        """Build a record from an extracted json dict, dropping unknown keys."""
+        kwargs = {}
+        for f in fields(cls):
+            if f.name not in data:
+                continue
+            value = data[f.name]
+            if f.name in LOW_CARDINALITY:
+                value = _intern(value)
+            kwargs[f.name] = value
+        return cls(**kwargs)
+
+    def to_dict(self) -> dict:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    @classmethod
+    def arrow_schema(cls) -> pa.Schema:
+        cols = []
+        for f in fields(cls):
+            if f.type == List[str]:
+                cols.append(pa.field(f.name, pa.list_(pa.string())))
+            elif f.name in LOW_CARDINALITY:
+                cols.append(pa.field(f.name, pa.dictionary(pa.int32(), pa.string())))
+            else:
+                cols.append(pa.field(f.name, pa.string()))
+        return pa.schema(cols)
+
+
+@dataclass(slots=True)
+class CanonicalClaim(Record):
+    id: str
+    text: str = ""
+    category: Optional[str] = ""
+    supporting_claims: List[str] = field(default_factory=list)
+    refuting_claims: List[str] = field(default_factory=list)
+    uncertain_claims: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Claim(Record):
+    id: str
+    canonical_id: str = ""
+    type: Optional[str] = ""
+    quote: Optional[str] = ""
+    text: str = ""
+    target: Optional[str] = ""
+    speaker: str = ""
+    categories: List[str] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)
+    events: List[str] = field(default_factory=list)
+    link: str = ""
+    file: str = ""
+
+
+@dataclass(slots=True)
+class Source(Record):
+    id: str
+    type: Optional[str] = ""
+    name: str = ""
+    reference: Optional[str] = ""
+
+
+@dataclass(slots=True)
+class Event(Record):
+    id: str
+    uname: str = ""
+    name: Optional[str] = ""
+    date: Optional[str] = ""
+    description: Optional[str] = ""
+    location: Optional[str] = ""
+
+
+@dataclass(slots=True)
+class Entity(Record):
+    id: str
+    uname: str = ""
+    type: Optional[str] = ""
+    name: str = ""
+    title: Optional[str] = ""
+    role: Optional[str] = ""
+
+
+class ClaimStore:
+    """
+    Typed, compact container for the aggregated corpus.
+
+    Holds each table as a list of slotted records in memory and converts to Arrow
+    tables for Parquet storage and pandas access. Table names match the keys of
+    DataGrabber.extract_data_from_fjson's result.
+    """
+
+    TABLES: Dict[str, Type[Record]] = {
+        "canonical_claims": CanonicalClaim,
+        "claims": Claim,
+        "sources": Source,
+        "events": Event,
+        "entities": Entity,
+    }
+
+    def __init__(self, **tables: List[Record]):
+        self.tables: Dict[str, List[Record]] = {
+            name: list(tables.get(name, [])) for name in self.TABLES
+        }
+
+    def __getitem__(self, name: str) -> List[Record]:
+        return self.tables[name]
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self.tables.values())
+
+    @classmethod
+    def from_grabbed(cls, data: dict) -> "ClaimStore":
+        """
+        Build a store from DataGrabber output ({table: {id: dict}}).
+
+        Args:
+            data: Result of DataGrabber.extract_data_from_fjson.
+
+        Returns:
+            A ClaimStore with one record per element.
+        """
+        tables = {}
+        for name, record_cls in cls.TABLES.items():
+            elements = data.get(name, {})
+            if isinstance(elements, dict):
+                elements = elements.values()
+            tables[name] = [record_cls.from_dict(element) for element in elements]
+        return cls(**tables)
+
+    def to_arrow(self, name: str) -> pa.Table:
+        """Convert one table to a columnar Arrow table."""
+        record_cls = self.TABLES[name]
+        records = self.tables[name]
+        columns = {
+            f.name: [getattr(record, f.name) for record in records]
+            for f in fields(record_cls)
+        }
+        return pa.Table.from_pydict(columns, schema=record_cls.arrow_schema())
+
+    def to_dataframe(self, name: str, zero_copy: bool = True) -> pd.DataFrame:
+        """
+        Convert one table to a pandas DataFrame.
+
+        Args:
+            name: Table name, one of ClaimStore.TABLES.
+            zero_copy: Back the columns with Arrow memory (pd.ArrowDtype) instead of
+                copying into numpy object columns. Use False for code that expects
+                plain python objects in cells, like DataFrame.to_sql.
+
+        Returns:
+            A pandas DataFrame with one column per record field.
+        """
+        if zero_copy:
+            return self.to_arrow(name).to_pandas(types_mapper=pd.ArrowDtype)
+        columns = [f.name for f in fields(self.TABLES[name])]
+        return pd.DataFrame([record.to_dict() for record in self.tables[name]], columns=columns)
+
+    def write_parquet(self, out_dir: Path) -> None:
+        """Write every table to <out_dir>/<table>.parquet."""
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for name in self.TABLES:
+            pq.write_table(self.to_arrow(name), out_dir / f"{name}.parquet")
+
+    @classmethod
+    def read_parquet(cls, in_dir: Path) -> "ClaimStore":
+        """Load a store previously saved with write_parquet."""
+        in_dir = Path(in_dir)
+        tables = {}
+        for name, record_cls in cls.TABLES.items():
+            path = in_dir / f"{name}.parquet"
+            if not path.exists():
+                continue
+            rows = pq.read_table(path).to_pylist()
+            tables[name] = [record_cls.from_dict(row) for row in rows]
+        return cls(**tables)
+
+
+def read_parquet_dataframe(path: Path) -> pd.DataFrame:
+    """Load a single Parquet table straight into an Arrow-backed DataFrame."""
+    return pq.read_table(path).to_pandas(types_mapper=pd.ArrowDtype)
@@ -0,0 +1,194 @@
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+
+from openai import OpenAI
+
+from config.settings import get_settings
+
+# OpenAI embeddings endpoint limit on inputs per request
+MAX_EMBEDDING_BATCH = 2048
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls out to at most `rate` per `period` seconds."""
+
+    def __init__(self, rate: int, period: float = 60.0):
+        self.interval = period / rate
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self) -> None:
+        """Block until the caller is allowed to make its next call."""
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+class Embedder(ABC):
+    """Interface shared by the embedding providers."""
+
+    # Identifies the model and output size, used to key cached embeddings
+    model_id: str
+    dimensions: int
+
+    @abstractmethod
+    def embed(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """Embed texts, returning one vector per text in input order."""
+
+
+class OpenAIEmbedder(Embedder):
+    """Embeddings from the OpenAI API, sent in concurrent, rate limited batches."""
+
+    def __init__(self, settings: Any, dimensions: int):
+        self.settings = settings
+        self.client = OpenAI(api_key=settings.api_key)
+        self.model = settings.embedding_model
+        self.dimensions = dimensions
+        self.model_id = f"{self.model}:{dimensions}"
+        self.rate_limiter = RateLimiter(settings.embedding_requests_per_minute)
+
+    def embed(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """
+        Embed texts through the API.
+
+        Batches are capped by count and by a rough token estimate, sent concurrently
+        (bounded by embedding_max_concurrency) and paced by the rate limiter.
+
+        Args:
+            texts: The input texts to generate embeddings for.
+            batch_size: Max texts per request (default: settings.embedding_batch_size).
+
+        Returns:
+            A list of embeddings in the same order as texts.
+        """
+        batch_size = min(batch_size or self.settings.embedding_batch_size, MAX_EMBEDDING_BATCH)
+        batches = self._make_batches(texts, batch_size, self.settings.embedding_batch_tokens)
+
+        with ThreadPoolExecutor(max_workers=self.settings.embedding_max_concurrency) as executor:
+            results = executor.map(self._embed_batch, batches)
+            return [embedding for batch in results for embedding in batch]
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """Embed one batch of texts with a single API call, keeping input order."""
+        self.rate_limiter.wait()
+        kwargs = {}
+        # Only the text-embedding-3 models accept a reduced output size
+        if self.model.startswith("text-embedding-3"):
+            kwargs["dimensions"] = self.dimensions
+        response = self.client.embeddings.create(
+            input=batch,
+            model=self.model,
+            **kwargs,
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    @staticmethod
+    def _make_batches(texts: List[str], batch_size: int, max_tokens: int) -> List[List[str]]:
+        """Split texts into batches of at most batch_size texts and ~max_tokens tokens (4 chars/token)."""
+        batches = []
+        batch = []
+        batch_tokens = 0
+        for text in texts:
+            tokens = len(text) // 4 + 1
+            if batch and (len(batch) >= batch_size or batch_tokens + tokens > max_tokens):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+
+class LocalEmbedder(Embedder):
+    """
+    Embeddings from a sentence-transformers model run on the local CPU.
+
+    Supports the PyTorch and ONNX Runtime backends, optionally int8 quantized
+    (dynamic quantization for torch, a pre-quantized model file for onnx).
+    """
+
+    def __init__(self, settings: Any):
+        # Only needed for local embedding, so not required by the OpenAI setup
+        from sentence_transformers import SentenceTransformer
+
+        self.settings = settings
+        model_kwargs = None
+        if settings.backend == "onnx" and settings.quantize:
+            model_kwargs = {"file_name": settings.onnx_quantized_file}
+
+        self.model = SentenceTransformer(
+            settings.model_name,
+            device=settings.device,
+            backend=settings.backend,
+            model_kwargs=model_kwargs,
+        )
+        if settings.backend == "torch" and settings.quantize:
+            import torch
+
+            torch.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+
+        self.dimensions = self.model.get_sentence_embedding_dimension()
+        suffix = "-int8" if settings.quantize else ""
+        self.model_id = f"local/{settings.model_name}{suffix}:{self.dimensions}"
+
+    def embed(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """
+        Embed texts with the local model.
+
+        Args:
+            texts: The input texts to generate embeddings for.
+            batch_size: Texts per forward pass (default: settings.batch_size).
+
+        Returns:
+            A list of unit-length embeddings in the same order as texts.
+        """
+        embeddings = self.model.encode(
+            texts,
+            batch_size=batch_size or self.settings.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        return embeddings.astype("float32").tolist()
+
+
+class EmbeddingFactory:
+    """Builds the embedding provider selected by settings.vector_store.embedding_provider."""
+
+    def __init__(self, provider: Optional[str] = None):
+        settings = get_settings()
+        self.provider = provider or settings.vector_store.embedding_provider
+        self.embedder = self._initialize_embedder(settings)
+        logging.info(
+            f"Using {self.provider} embeddings: {self.embedder.model_id}"
+        )
+
+    def _initialize_embedder(self, settings: Any) -> Embedder:
+        dimensions = settings.vector_store.embedding_dimensions
+        embedder_initializers = {
+            "openai": lambda s: OpenAIEmbedder(s.openai, dimensions),
+            "local": lambda s: LocalEmbedder(s.local_embedding),
+        }
+
+        initializer = embedder_initializers.get(self.provider)
+        if not initializer:
+            raise ValueError(f"Unsupported embedding provider: {self.provider}")
+
+        embedder = initializer(settings)
+        if embedder.dimensions != dimensions:
+            raise ValueError(
+                f"{embedder.model_id} produces {embedder.dimensions}-d embeddings but "
+                f"vector_store.embedding_dimensions is {dimensions}. Set it to "
+                f"{embedder.dimensions} and use a table_name created for that size."
+            )
+        return embedder
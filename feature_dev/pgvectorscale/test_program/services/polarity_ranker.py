@@ -0,0 +1,147 @@
+import logging
+import time
+from typing import Any, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from config.settings import get_settings
+from database.polarity_cache import PolarityCache
+
+# Columns added to re-ranked results, probabilities in this order
+LABELS = ("entail", "contradict", "neutral")
+
+# Label order of the sentence-transformers cross-encoder/nli-* models, used when the
+# model config doesn't name its labels
+DEFAULT_ID2LABEL = {0: "contradiction", 1: "entailment", 2: "neutral"}
+
+
+class PolarityReranker:
+    """
+    Labels search hits as entailing, contradicting or neutral to a query claim.
+
+    Embedding distance can't tell "X is a criminal" from "X is not a criminal", a small
+    NLI cross-encoder reading both texts together can. Each hit is the premise and the
+    query claim the hypothesis, pairs are classified in batches on the CPU and the
+    probabilities cached (see PolarityCache), replacing an LLM call per claim pair.
+    """
+
+    def __init__(self, settings: Optional[Any] = None):
+        """
+        Args:
+            settings: PolaritySettings (default: settings.polarity).
+        """
+        self.settings = settings or get_settings().polarity
+        self.model_name = self.settings.model_name
+        self._model = None
+        self._order: Optional[List[int]] = None
+        self.cache = None
+        if self.settings.cache_enabled:
+            self.cache = PolarityCache(self.settings.cache_path)
+
+    @property
+    def model(self):
+        # Only needed for polarity, and the model loads in seconds, so on first use
+        if self._model is None:
+            from sentence_transformers import CrossEncoder
+
+            self._model = CrossEncoder(self.model_name, device=self.settings.device)
+            config = getattr(self._model, "config", None)
+            id2label = getattr(config, "id2label", None) or DEFAULT_ID2LABEL
+            if not any("entail" in str(label).lower() for label in id2label.values()):
+                id2label = DEFAULT_ID2LABEL
+            # Model output column of each of LABELS
+            self._order = [
+                next(int(i) for i, label in id2label.items() if str(label).lower().startswith(name[:6]))
+                for name in LABELS
+            ]
+        return self._model
+
+    def _predict(self, pairs: List[Tuple[str, str]]) -> np.ndarray:
+        """(entail, contradict, neutral) probabilities of (premise, hypothesis) pairs, via the model."""
+        start_time = time.time()
+        scores = self.model.predict(
+            pairs,
+            batch_size=self.settings.batch_size,
+            apply_softmax=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        logging.info(f"Classified {len(pairs)} claim pairs in {time.time() - start_time:.3f} seconds")
+        return np.asarray(scores, dtype=np.float32)[:, self._order]
+
+    def classify(self, query: str, texts: List[str]) -> np.ndarray:
+        """
+        Polarity of each text relative to the query claim.
+
+        Cached pairs are not re-classified, repeated texts are classified once.
+
+        Args:
+            query: The query claim (hypothesis).
+            texts: Claims to label (premises).
+
+        Returns:
+            An (N, 3) float32 array of (entail, contradict, neutral) probabilities.
+        """
+        probs = np.zeros((len(texts), len(LABELS)), dtype=np.float32)
+        if not texts:
+            return probs
+        pairs = [(text, query) for text in texts]
+
+        pending = list(range(len(pairs)))
+        if self.cache:
+            cached = self.cache.get_many(self.model_name, pairs)
+            pending = [i for i, row in enumerate(cached) if row is None]
+            for i, row in enumerate(cached):
+                if row is not None:
+                    probs[i] = row
+
+        if pending:
+            unique = list(dict.fromkeys(pairs[i] for i in pending))
+            predicted = dict(zip(unique, self._predict(unique)))
+            for i in pending:
+                probs[i] = predicted[pairs[i]]
+            if self.cache:
+                self.cache.put_many(self.model_name, unique, np.array([predicted[pair] for pair in unique]))
+        if self.cache:
+            self.cache.log_stats()
+        return probs
+
+    def rerank(
+        self,
+        query: str,
+        results: Union[pd.DataFrame, List[Tuple[Any, ...]]],
+        stance: Optional[str] = None,
+        content_column: Union[str, int] = "content",
+    ) -> pd.DataFrame:
+        """
+        Add polarity columns to search results, optionally ordering them by a stance.
+
+        Args:
+            query: The query claim the results were searched for.
+            results: A search DataFrame, or result tuples (content at content_column).
+            stance: "entail" or "contradict" orders results by that probability, best
+                first. None keeps the search order.
+            content_column: Column (DataFrame) or tuple position holding the claim text.
+
+        Returns:
+            The results as a DataFrame with a "polarity" label column (argmax of LABELS)
+            and one probability column per label.
+        """
+        if stance is not None and stance not in LABELS:
+            raise ValueError(f"Unsupported stance: {stance} (expected one of {LABELS})")
+        if isinstance(results, pd.DataFrame):
+            df = results.copy()
+            texts = df[content_column].tolist()
+        else:
+            df = pd.DataFrame(list(results))
+            texts = [row[content_column if isinstance(content_column, int) else 2] for row in results]
+
+        probs = self.classify(query, [text or "" for text in texts])
+        for i, name in enumerate(LABELS):
+            df[name] = probs[:, i]
+        df["polarity"] = [LABELS[i] for i in probs.argmax(axis=1)] if len(df) else []
+
+        if stance is not None:
+            df = df.sort_values(stance, ascending=False, kind="stable").reset_index(drop=True)
+        return df
@@ -1,7 +1,8 @@
 # vector insert imports
 from datetime import datetime
 import pandas as pd
-from database.vector_store import VectorStore
+from config.settings import get_settings
+from database.backends import get_vector_store
 from timescale_vector.client import uuid_from_time
 
 # Similarity search imports
@@ -12,10 +13,8 @@ from timescale_vector import client
 
 from grab_data import DataGrabber
 
-# TODO: Look to parallelize embedding gen?
-
 def main():
-    vec = VectorStore()
+    vec = get_vector_store()
 
     # Set up DB
     # data_grab = DataGrabber()
@@ -23,9 +22,9 @@ def main():
     # canon_claims = data_grab.extract_data_from_fjson()["canonical_claims"]
     # data_rows = []
     # print("Getting Embeddings from OpenAI...")
-    # for cclaim in canon_claims.values():
-    #     content = cclaim["text"]
-    #     embedding = vec.get_embedding(content)
+    # contents = [cclaim["text"] for cclaim in canon_claims.values()]
+    # embeddings = vec.get_embeddings(contents)
+    # for cclaim, content, embedding in zip(canon_claims.values(), contents, embeddings):
     #     entry = {
     #         "id": str(uuid_from_time(datetime.now())),
     #         "metadata": {
@@ -45,6 +44,11 @@ def main():
     # print("Adding DataFrame to DB...")
     # vec.upsert(df)
 
+    # hybrid_search needs the full-text column on Postgres, a no-op once the table has it
+    # (the local backend backfills its own on open)
+    if get_settings().vector_store.backend == "timescale":
+        vec.create_text_index()
+
     print("Finished setup, entering input loop.")
     # Question loop w/ similarity search
     query = None
@@ -53,7 +57,9 @@ def main():
         if query == "exit":
             continue
 
-        results: pd.DataFrame = vec.search(query, limit=10)
+        # Names like "Tren de Aragua" are answered from the full-text index, other
+        # queries fuse full-text and vector rankings
+        results: pd.DataFrame = vec.hybrid_search(query, limit=10, columns=["distance", "content"])
         #response = Synthesizer.generate_response(question=query, context=results)
 
         print(f"DB results:")
@@ -1,4 +1,4 @@
-from txtai.embeddings import Embeddings
+import logging
 import os
 from pathlib import Path
 import json
@@ -10,6 +10,10 @@ import pprint
 import matplotlib.pyplot as plt
 import networkx as nx
 
+from semantic_graph import SemanticGraph
+
+logging.basicConfig(level=logging.INFO)
+
 # Grab data from result of feature_dev/data_processor
 PROJ_ROOT = Path(os.environ["PROJ_ROOT"])
 data_file = PROJ_ROOT/ "feature_dev/data_processor/outputs/claims.json"
@@ -17,44 +21,33 @@ data_file = PROJ_ROOT/ "feature_dev/data_processor/outputs/claims.json"
 with open(data_file, "r") as f:
     claims = json.load(f)
 
-embeddings = Embeddings({
-    "path": "sentence-transformers/all-MiniLM-L6-v2",
-    #"path": "sentence-transformers/paraphrase-MiniLM-L3-v2",
-    "content": True,
-    "functions": [
-        {"name": "graph", "function": "graph.attribute"},
-    ],
-    "expressions": [
-        {"name": "category", "expression": "graph(indexid, 'category')"},
-        {"name": "topic", "expression": "graph(indexid, 'topic')"},
-        {"name": "topicrank", "expression": "graph(indexid, 'topicrank')"}
-    ],
-    "graph": {
-        "limit": 5,
-        "minscore": 0.1,
-        "topics": {
-            "categories": claims["claim_categories"]
-        }
-    }
-})
-
-embeddings.index((x, text, None) for x, text in enumerate(claims["claim_texts"]))
-graph = embeddings.graph
+# Graph is saved next to this script and reloaded on later launches, only claims
+# not in it yet get embedded and linked
+graph = SemanticGraph(
+    Path(__file__).parent / "graph_data",
+    model="sentence-transformers/all-MiniLM-L6-v2",
+    #model="sentence-transformers/paraphrase-MiniLM-L3-v2",
+    limit=5,
+    minscore=0.1,
+    categories=claims["claim_categories"],
+)
+if graph.add(claims["claim_texts"]):
+    graph.save()
 print()
-print(len(embeddings.graph.topics))
+print(len(graph.topics))
 print(list(graph.topics.keys())[:5])
 print()
 top_topic = list(graph.topics.keys())[1]
 print(top_topic)
-print(embeddings.search(f"select text from txtai where topic = '{top_topic}' and topicrank = 0", 1)[0]["text"])
+print(graph.texts[graph.topics[top_topic][0]])
 print()
 print()
 
-for x, topic in enumerate(list(graph.topics.keys())[:5]):
-    print(graph.categories[x], topic)
+for topic in list(graph.topics.keys())[:5]:
+    print(graph.attribute(graph.topics[topic][0], "category"), topic)
      
 # Plot graph
-# labels = {x: f"{graph.attribute(x, 'id')} ({x})" for x in graph.scan()}
+# labels = {x: f"{graph.attribute(x, 'topic')} ({x})" for x in graph.backend.nodes}
 # options = {
 #     "node_size": 750,
 #     "node_color": "#0277bd",
@@ -77,14 +70,14 @@ print()
 print()
 
 # for x in graph.showpath(50, 100):
-#     print(graph.node(x))
+#     print(graph.texts[x])
 
 # print()
 # print()
 # query = "Are immigrants causing crime"
 # print(f"query: {query}")
-# #print([(result["score"], result["text"]) for result in embeddings.search(query, limit=50)])
-# for result in embeddings.search(query, limit=10):
+# #print([(result["score"], result["text"]) for result in graph.search(query, limit=50)])
+# for result in graph.search(query, limit=10):
 #     pprint.pp(result, indent=4, width=120)
 #     print()
 
@@ -93,7 +86,7 @@ print()
 
 # query = "Can you tell me about Tren de Aragua"
 # print(f"query: {query}")
-# for result in embeddings.search(query, limit=10):
+# for result in graph.search(query, limit=10):
 #     pprint.pp(result, indent=4, width=120)
 #     print()
 
@@ -102,7 +95,7 @@ print()
 
 query = "Who is against deporting illegal immigrants"
 print(f"query: {query}")
-for result in embeddings.search(query, limit=10):
+for result in graph.search(query, limit=10):
     pprint.pp(result, indent=4, width=120)
     print()
 
@@ -112,7 +105,7 @@ while True:
         break
 
     query = user_input
-    for result in embeddings.search(query, limit=10):
+    for result in graph.search(query, limit=10):
         pprint.pp(result, indent=4, width=120)
         print()
     print()
\ No newline at end of file
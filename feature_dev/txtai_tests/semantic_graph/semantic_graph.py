@@ -0,0 +1,315 @@
+"""
+Persistent semantic graph of claims.
+
+txtai's Embeddings graph (limit=5, minscore=0.1) is rebuilt in memory on every launch
+and thrown away on exit. SemanticGraph keeps the same model in a directory instead:
+
+    embeddings.npy   normalized float32 sentence embeddings, one row per node
+    index.bin        hnswlib cosine index over the embeddings
+    edges.npz        sparse k-NN edges (src, dst, weight), weight = cosine similarity
+    nodes.json       node texts, topic / topicrank / category attributes, topics and
+                     term document frequencies (for topic names)
+
+k-NN edges are found with batched hnswlib queries. add() only embeds and queries the
+new texts, then reruns topic detection on the new nodes plus the topics of their
+neighbours, all other topics are kept as they are.
+"""
+
+import json
+import logging
+import math
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Union
+
+import hnswlib
+import networkx as nx
+import numpy as np
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+STOPWORDS = {
+    "a", "about", "after", "all", "also", "an", "and", "any", "are", "as", "at", "be", "been",
+    "but", "by", "can", "could", "did", "do", "does", "for", "from", "had", "has", "have", "he",
+    "her", "his", "if", "in", "into", "is", "it", "its", "more", "most", "no", "not", "of", "on",
+    "or", "our", "out", "over", "said", "says", "she", "should", "so", "than", "that", "the",
+    "their", "them", "there", "these", "they", "this", "those", "to", "up", "was", "we", "were",
+    "what", "when", "which", "who", "will", "with", "would", "you",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in STOPWORDS and len(token) > 1]
+
+
+class SemanticGraph:
+    """k-NN similarity graph over texts with topics, persisted to a directory."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        model: str = MODEL_NAME,
+        limit: int = 5,
+        minscore: float = 0.1,
+        batch_size: int = 1024,
+        ef: int = 100,
+        categories: Optional[List[str]] = None,
+    ):
+        """
+        Args:
+            path: Directory holding the graph files, loaded if it already has them (model,
+                limit and minscore must match the stored graph).
+            model: sentence-transformers model used for the embeddings.
+            limit: Max neighbors linked to each node (txtai graph "limit").
+            minscore: Min cosine similarity for an edge (txtai graph "minscore").
+            batch_size: Texts encoded / nodes queried per batch.
+            ef: hnswlib query breadth, higher is more exact and slower.
+            categories: Category labels, each topic is tagged with the closest one.
+        """
+        self.path = Path(path)
+        self.model_name = model
+        self.limit = limit
+        self.minscore = minscore
+        self.batch_size = batch_size
+        self.ef = ef
+        self.categories = categories or []
+        self._model = None
+        self._category_embeddings = None
+
+        self.texts: List[str] = []
+        self.attributes: List[dict] = []
+        self.topics: Dict[str, List[int]] = {}
+        self.document_frequency: Counter = Counter()
+        self.embeddings = np.empty((0, 0), dtype=np.float32)
+        self.index = None
+        self.backend = nx.Graph()
+
+        if (self.path / "nodes.json").exists():
+            self.load()
+
+    @property
+    def model(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Normalized float32 embeddings of texts."""
+        embeddings = self.model.encode(
+            texts, batch_size=min(self.batch_size, 256), convert_to_numpy=True, normalize_embeddings=True
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def _new_index(self, dim: int, max_elements: int):
+        index = hnswlib.Index(space="cosine", dim=dim)
+        index.init_index(max_elements=max(max_elements, 1), ef_construction=200, M=16)
+        index.set_ef(self.ef)
+        return index
+
+    def add(self, texts: List[str]) -> List[int]:
+        """
+        Add texts as new nodes, link them to their nearest neighbors and refresh the
+        topics they joined.
+
+        Args:
+            texts: New texts, ones already in the graph are skipped.
+
+        Returns:
+            Node ids of the added texts.
+        """
+        known = set(self.texts)
+        texts = [text for text in dict.fromkeys(texts) if text not in known]
+        if not texts:
+            return []
+        start_time = time.time()
+
+        new_embeddings = self.encode(texts)
+        start = len(self.texts)
+        ids = np.arange(start, start + len(texts))
+
+        if self.index is None:
+            self.index = self._new_index(new_embeddings.shape[1], len(texts))
+            self.embeddings = new_embeddings
+        else:
+            self.index.resize_index(start + len(texts))
+            self.embeddings = np.vstack([self.embeddings, new_embeddings])
+        for offset in range(0, len(texts), self.batch_size):
+            self.index.add_items(new_embeddings[offset:offset + self.batch_size], ids[offset:offset + self.batch_size])
+        self.texts.extend(texts)
+        self.attributes.extend({} for _ in texts)
+        self.document_frequency.update(token for text in texts for token in set(tokenize(text)))
+        self.backend.add_nodes_from(ids.tolist())
+
+        edges = self._knn_edges(new_embeddings, ids)
+        self.backend.add_weighted_edges_from(edges)
+        logging.info(
+            f"Added {len(texts)} nodes and {len(edges)} edges in {time.time() - start_time:.3f} seconds"
+        )
+
+        self._update_topics(set(ids.tolist()))
+        return ids.tolist()
+
+    def _knn_edges(self, embeddings: np.ndarray, ids: np.ndarray) -> List[tuple]:
+        """(src, dst, weight) edges from each node in ids to its limit nearest neighbors."""
+        k = min(self.limit + 1, len(self.texts))
+        edges = []
+        for offset in range(0, len(ids), self.batch_size):
+            neighbors, distances = self.index.knn_query(embeddings[offset:offset + self.batch_size], k=k)
+            for src, row, dists in zip(ids[offset:offset + self.batch_size], neighbors, distances):
+                for dst, dist in zip(row[row != src][:self.limit], dists[row != src][:self.limit]):
+                    score = 1.0 - float(dist)
+                    if score >= self.minscore:
+                        edges.append((int(src), int(dst), score))
+        return edges
+
+    def _update_topics(self, changed: Set[int]) -> None:
+        """
+        Rerun community detection on the changed nodes and the topics of their neighbours.
+
+        With a low minscore the k-NN graph is usually one connected component, so
+        redoing whole components would redo every topic. Only topics a new node links
+        into can gain it, those are dissolved and redetected together with the new
+        nodes, every other topic is kept.
+        """
+        start_time = time.time()
+        neighbourhood = set(changed)
+        for node in changed:
+            neighbourhood.update(self.backend.neighbors(node))
+        touched = {self.attributes[node].get("topic") for node in neighbourhood} - {None}
+
+        nodes = set(changed)
+        for name in touched:
+            nodes.update(self.topics.pop(name, []))
+
+        subgraph = self.backend.subgraph(nodes)
+        communities = nx.community.louvain_communities(subgraph, weight="weight", seed=0)
+        for community in communities:
+            name = self._topic_name(community)
+            centrality = nx.degree_centrality(subgraph.subgraph(community)) if len(community) > 1 else {}
+            ranked = sorted(community, key=lambda node: (-centrality.get(node, 0.0), node))
+            category = self._category(ranked)
+            self.topics[name] = ranked
+            for rank, node in enumerate(ranked):
+                self.attributes[node].update(topic=name, topicrank=rank, category=category)
+
+        logging.info(
+            f"Rebuilt {len(touched)} topics into {len(communities)} over {len(nodes)} nodes "
+            f"in {time.time() - start_time:.3f} seconds"
+        )
+
+    def _topic_name(self, community: Set[int]) -> str:
+        """Top tf-idf terms of a community's texts joined with "_", like txtai topic names."""
+        counts = Counter(token for node in community for token in tokenize(self.texts[node]))
+        total = len(self.texts)
+        terms = sorted(
+            counts, key=lambda term: (-counts[term] * math.log(1 + total / self.document_frequency[term]), term)
+        )[:4]
+        base = "_".join(terms) or f"topic_{min(community)}"
+        name, suffix = base, 1
+        while name in self.topics:
+            suffix += 1
+            name = f"{base}_{suffix}"
+        return name
+
+    def _category(self, nodes: List[int]) -> Optional[str]:
+        """Category label closest to the centroid of nodes."""
+        if not self.categories:
+            return None
+        if self._category_embeddings is None:
+            self._category_embeddings = self.encode(self.categories)
+        centroid = self.embeddings[nodes].mean(axis=0)
+        return self.categories[int(np.argmax(self._category_embeddings @ centroid))]
+
+    def attribute(self, node: int, name: str):
+        """Node attribute (topic, topicrank or category), like txtai graph.attribute."""
+        return self.attributes[node].get(name)
+
+    def showpath(self, source: int, target: int) -> List[int]:
+        """Nodes on the most similar path between two nodes, like txtai graph.showpath."""
+        try:
+            # 1 - similarity as the edge cost, so close claims make short hops
+            return nx.shortest_path(
+                self.backend, source, target, weight=lambda u, v, data: 1.0 - data["weight"]
+            )
+        except nx.NetworkXNoPath:
+            return []
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """
+        Nearest texts to a query.
+
+        Returns:
+            Dicts with id, text, score, topic, topicrank and category, best first.
+        """
+        if not self.texts:
+            return []
+        neighbors, distances = self.index.knn_query(self.encode([query]), k=min(limit, len(self.texts)))
+        return [
+            {"id": int(node), "text": self.texts[node], "score": 1.0 - float(dist), **self.attributes[node]}
+            for node, dist in zip(neighbors[0], distances[0])
+        ]
+
+    def save(self) -> None:
+        """Write the graph to self.path."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        np.save(self.path / "embeddings.npy", self.embeddings)
+        if self.index is not None:
+            self.index.save_index(str(self.path / "index.bin"))
+        edges = np.array([(u, v) for u, v in self.backend.edges()], dtype=np.int64).reshape(-1, 2)
+        weights = np.array([w for _, _, w in self.backend.edges(data="weight")], dtype=np.float32)
+        np.savez(self.path / "edges.npz", edges=edges, weights=weights)
+        with open(self.path / "nodes.json", "w") as f:
+            json.dump(
+                {
+                    "model": self.model_name,
+                    "limit": self.limit,
+                    "minscore": self.minscore,
+                    "categories": self.categories,
+                    "texts": self.texts,
+                    "attributes": self.attributes,
+                    "topics": self.topics,
+                    "document_frequency": self.document_frequency,
+                },
+                f,
+            )
+        logging.info(f"Saved semantic graph ({len(self.texts)} nodes) to {self.path}")
+
+    def load(self) -> None:
+        """Read the graph back from self.path."""
+        with open(self.path / "nodes.json", "r") as f:
+            nodes = json.load(f)
+        # Embeddings and edges of another model or graph settings can't be mixed with new ones
+        stored = {"model": nodes["model"], "limit": nodes["limit"], "minscore": nodes["minscore"]}
+        requested = {"model": self.model_name, "limit": self.limit, "minscore": self.minscore}
+        if stored != requested:
+            raise ValueError(
+                f"Semantic graph at {self.path} was built with {stored}, not {requested}, use a new path"
+            )
+        self.categories = self.categories or nodes["categories"]
+        self.texts = nodes["texts"]
+        self.attributes = nodes["attributes"]
+        self.topics = nodes["topics"]
+        if "document_frequency" in nodes:
+            self.document_frequency = Counter(nodes["document_frequency"])
+        else:
+            self.document_frequency = Counter(token for text in self.texts for token in set(tokenize(text)))
+
+        self.embeddings = np.load(self.path / "embeddings.npy")
+        if self.texts:
+            self.index = hnswlib.Index(space="cosine", dim=self.embeddings.shape[1])
+            self.index.load_index(str(self.path / "index.bin"), max_elements=len(self.texts))
+            self.index.set_ef(self.ef)
+
+        edges = np.load(self.path / "edges.npz")
+        self.backend = nx.Graph()
+        self.backend.add_nodes_from(range(len(self.texts)))
+        self.backend.add_weighted_edges_from(
+            (int(u), int(v), float(w)) for (u, v), w in zip(edges["edges"], edges["weights"])
+        )
+        logging.info(f"Loaded semantic graph ({len(self.texts)} nodes) from {self.path}")